@@ -1,3 +1,33 @@
+import os
+import multiprocessing
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from contextlib import contextmanager
+
+from instrumentation import span
+from problem import to_backtracking
+
+
+class SearchCancelled(Exception):
+    """Raised inside a search when its should_stop callback fires."""
+
+
+@contextmanager
+def search_depth(n_courses):
+    """
+    The searches recurse once per course (twice when instrumented), so raise
+    the recursion limit by that much for the duration and then restore it.
+    """
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(limit + 2 * n_courses)
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(limit)
+
+
 class Timetabling:
     def __init__(self, courses, professors, rooms, time_slots, constraints):
         self.courses = courses
@@ -6,77 +36,829 @@ class Timetabling:
         self.time_slots = time_slots
         self.constraints = constraints
         self.schedule = {}
+        self.energy_usage = 0
+
+        # Precomputed lookups
+        self.room_constraints = constraints.get("room_constraints", {})
+        self.professor_constraints = constraints.get("professor_constraints", {})
+        self.course_sizes = constraints.get("course_sizes", {})
+        self.professor_slots = {professor: set(slots) for professor, slots in professors.items()}
+        self.room_capacity = {room["name"]: room["capacity"] for room in rooms}
+        self.conflict_map = {}
+        for course1, course2 in constraints.get("no_overlap", []):
+            if course1 != course2:
+                self.conflict_map.setdefault(course1, set()).add(course2)
+                self.conflict_map.setdefault(course2, set()).add(course1)
+
+        # Occupancy indexes, kept in sync with self.schedule by assign()/unassign()
+        self.room_slot_used = set()
+        self.professor_slot_used = set()
+
+        # Optional cancellation callback, polled every 256 search nodes
+        self.should_stop = None
+        self.nodes = 0
+
+        # Optional instrumentation.Recorder, set by instrument()
+        self.recorder = None
+
+        # Preferred (professor, room, time_slot) per course, set by warm_start()
+        self.hints = {}
 
     def is_valid_assignment(self, course, professor, room, time_slot):
         # Check specific room constraints
-        if course in self.constraints.get("room_constraints", {}):
-            required_room = self.constraints["room_constraints"][course]
-            if room != required_room:
-                return False
+        required_room = self.room_constraints.get(course)
+        if required_room is not None and room != required_room:
+            return False
+
+        # Check fixed professors
+        required_professor = self.professor_constraints.get(course)
+        if required_professor is not None and professor != required_professor:
+            return False
+
+        # Check room capacity
+        if self.course_sizes.get(course, 0) > self.room_capacity[room]:
+            return False
 
         # Check professor availability
-        if time_slot not in self.professors[professor]:
+        if time_slot not in self.professor_slots[professor]:
             return False
 
         # Check room availability
-        for assigned_course, details in self.schedule.items():
-            if details["room"] == room and details["time_slot"] == time_slot:
-                return False
+        if (room, time_slot) in self.room_slot_used:
+            return False
 
         # Check professor assignment conflicts
-        for assigned_course, details in self.schedule.items():
-            if details["professor"] == professor and details["time_slot"] == time_slot:
-                return False
+        if (professor, time_slot) in self.professor_slot_used:
+            return False
 
         # Check "no overlap" constraints
-        for conflict_pair in self.constraints.get("no_overlap", []):
-            if course in conflict_pair:
-                other_course = conflict_pair[0] if conflict_pair[1] == course else conflict_pair[1]
-                if other_course in self.schedule and self.schedule[other_course]["time_slot"] == time_slot:
-                    return False
+        for other_course in self.conflict_map.get(course, ()):
+            if other_course in self.schedule and self.schedule[other_course]["time_slot"] == time_slot:
+                return False
 
         return True
 
+    def assign(self, course, professor, room, time_slot):
+        self.schedule[course] = {
+            "professor": professor,
+            "room": room,
+            "time_slot": time_slot,
+        }
+        self.room_slot_used.add((room, time_slot))
+        self.professor_slot_used.add((professor, time_slot))
+        self.energy_usage += self.room_capacity[room]
+
+    def unassign(self, course):
+        details = self.schedule.pop(course)
+        self.room_slot_used.discard((details["room"], details["time_slot"]))
+        self.professor_slot_used.discard((details["professor"], details["time_slot"]))
+        self.energy_usage -= self.room_capacity[details["room"]]
+
+    @classmethod
+    def from_problem(cls, problem):
+        """
+        Build a Timetabling instance from a shared Problem (see problem.py).
+        """
+        return cls(*to_backtracking(problem))
+
+    def _room_class(self, room):
+        # Rooms of one class are interchangeable; capacity only matters once courses have sizes
+        return self.room_capacity[room] if self.course_sizes else None
+
+    def instrument(self, recorder):
+        """
+        Report to an instrumentation.Recorder: search nodes, backtracks (subtrees
+        that failed and were undone) and constraint checks (is_valid_assignment
+        calls; the mrv and bitset engines check whole domains instead), plus a
+        span per solve(). The counting wrappers replace the methods on this
+        instance only, so an uninstrumented search runs unchanged.
+        """
+        self.recorder = recorder
+        for name in ("backtrack", "backtrack_mrv", "backtrack_bitset"):
+            setattr(self, name, _counted_search(getattr(self, name), recorder))
+        is_valid_assignment = self.is_valid_assignment
+
+        def counted_check(course, professor, room, time_slot):
+            recorder.count("backtracking.checks")
+            return is_valid_assignment(course, professor, room, time_slot)
+
+        self.is_valid_assignment = counted_check
+
+    def warm_start(self, schedule):
+        """
+        Try the assignments of an earlier schedule (e.g. of a slightly different
+        instance) first: the basic and mrv engines order values so that a course's
+        hinted slot, room and professor come before any other. Assignments naming
+        an unknown professor, room or slot are ignored.
+        """
+        self.hints = {
+            course: (details["professor"], details["room"], details["time_slot"])
+            for course, details in schedule.items()
+            if details.get("professor") in self.professor_slots and details.get("room") in self.room_capacity
+            and details.get("time_slot") in self.time_slots
+        }
+
+    def assign_hints(self):
+        """
+        Assign every course whose hint is still valid, in course order, as the
+        starting point of a search. Returns the courses assigned.
+        """
+        assigned = []
+        for course in self.courses:
+            hint = self.hints.get(course)
+            if course not in self.schedule and hint is not None and self.is_valid_assignment(course, *hint):
+                self.assign(course, *hint)
+                assigned.append(course)
+        return assigned
+
+    def _visit(self):
+        self.nodes += 1
+        if self.should_stop is not None and self.nodes % 256 == 0 and self.should_stop():
+            raise SearchCancelled()
+
     def calculate_energy_savings(self):
         baseline_energy = sum(room["capacity"] for room in self.rooms for _ in self.time_slots)
         optimized_energy = self.energy_usage
         return round((baseline_energy - optimized_energy) / baseline_energy * 100, 2)
 
     def backtrack(self, course_index=0):
+        self._visit()
         if course_index == len(self.courses):
             return True  # All courses scheduled successfully
 
         course = self.courses[course_index]
+        if course in self.schedule:
+            return self.backtrack(course_index + 1)  # Already placed
+
+        hint = self.hints.get(course)
+        if hint is not None and self.is_valid_assignment(course, *hint):
+            self.assign(course, *hint)
+            if self.backtrack(course_index + 1):
+                return True
+            self.unassign(course)
+
         for time_slot in self.time_slots:
             for room in self.rooms:
                 for professor in self.professors:
+                    if hint is not None and hint == (professor, room["name"], time_slot):
+                        continue  # Tried first
                     if self.is_valid_assignment(course, professor, room["name"], time_slot):
                         # Assign the course
-                        self.schedule[course] = {
-                            "professor": professor,
-                            "room": room["name"],
-                            "time_slot": time_slot,
-                        }
-                        self.energy_usage += room["capacity"]
+                        self.assign(course, professor, room["name"], time_slot)
 
                         # Recurse to the next course
                         if self.backtrack(course_index + 1):
                             return True
 
                         # Backtrack
-                        del self.schedule[course]
-                        self.energy_usage -= room["capacity"]
+                        self.unassign(course)
+
+        return False
+
+    def _blocked_slots(self, course):
+        """
+        Time slots taken by already scheduled courses that conflict with `course`.
+        """
+        return {
+            self.schedule[other_course]["time_slot"]
+            for other_course in self.conflict_map.get(course, ())
+            if other_course in self.schedule
+        }
+
+    def _option_functions(self):
+        """
+        room_options(course, time_slot) and professor_options(course, time_slot):
+        the rooms and professors still free for a course in a slot, given its
+        fixed room or professor and its size. The free rooms and professors of
+        every slot are collected once and shared by both.
+        """
+        free_rooms = {}
+        free_professors = {}
+        for time_slot in self.time_slots:
+            free_rooms[time_slot] = [
+                room["name"] for room in self.rooms if (room["name"], time_slot) not in self.room_slot_used
+            ]
+            free_professors[time_slot] = [
+                professor for professor, slots in self.professor_slots.items()
+                if time_slot in slots and (professor, time_slot) not in self.professor_slot_used
+            ]
+
+        def room_options(course, time_slot):
+            required_room = self.room_constraints.get(course)
+            if required_room is None:
+                rooms = free_rooms[time_slot]
+            elif required_room not in self.room_capacity:
+                return []  # Fixed to a room that does not exist
+            else:
+                rooms = [required_room] if (required_room, time_slot) not in self.room_slot_used else []
+            size = self.course_sizes.get(course, 0)
+            return [room for room in rooms if self.room_capacity[room] >= size] if size else rooms
+
+        def professor_options(course, time_slot):
+            required_professor = self.professor_constraints.get(course)
+            if required_professor is None:
+                return free_professors[time_slot]
+            return [required_professor] if required_professor in free_professors[time_slot] else []
+
+        return room_options, professor_options
+
+    def backtrack_mrv(self):
+        """
+        Backtracking with minimum-remaining-values course ordering,
+        least-constraining-value ordering and forward checking.
+
+        Professors that no unscheduled course is fixed to are interchangeable
+        within a slot, and so are rooms of equal capacity that no unscheduled
+        course is fixed to, so only one representative of each is tried.
+        """
+        self._visit()
+        unscheduled = [course for course in self.courses if course not in self.schedule]
+        if not unscheduled:
+            return True
+
+        room_options, professor_options = self._option_functions()
+
+        # Forward checking + MRV: fail as soon as any remaining domain is empty
+        blocked = {}
+        best_course, best_key = None, None
+        for course in unscheduled:
+            blocked[course] = self._blocked_slots(course)
+            size = sum(
+                len(room_options(course, time_slot)) * len(professor_options(course, time_slot))
+                for time_slot in self.time_slots
+                if time_slot not in blocked[course]
+            )
+            if size == 0:
+                return False
+            degree = sum(1 for other in self.conflict_map.get(course, ()) if other not in self.schedule)
+            key = (size, -degree)
+            if best_key is None or key < best_key:
+                best_course, best_key = course, key
+        course = best_course
+
+        # Least-constraining value: prefer slots that fewest unscheduled neighbours can still use
+        neighbours = [other for other in self.conflict_map.get(course, ()) if other in blocked]  # Unscheduled ones
+        fixed_rooms = {
+            self.room_constraints[other] for other in unscheduled
+            if other != course and other in self.room_constraints
+        }
+        fixed_professors = {
+            self.professor_constraints[other] for other in unscheduled
+            if other != course and other in self.professor_constraints
+        }
+        hint_professor, hint_room, hint_slot = self.hints.get(course, (None, None, None))
+        candidates = []
+        for time_slot in self.time_slots:
+            rooms = room_options(course, time_slot)
+            professors = professor_options(course, time_slot)
+            if time_slot in blocked[course] or not rooms or not professors:
+                continue
+            constrained = sum(1 for other in neighbours if time_slot not in blocked[other])
+            representatives = {}
+            if time_slot == hint_slot and hint_room in rooms and hint_room not in fixed_rooms:
+                representatives[self._room_class(hint_room)] = hint_room  # It represents its class
+            for room in rooms:
+                if room not in fixed_rooms:
+                    representatives.setdefault(self._room_class(room), room)
+            rooms = list(representatives.values()) + [room for room in rooms if room in fixed_rooms]
+            interchangeable = [professor for professor in professors if professor not in fixed_professors]
+            professors = interchangeable[:1] + [professor for professor in professors if professor in fixed_professors]
+            if time_slot == hint_slot:
+                rooms.sort(key=lambda room: room != hint_room)
+                if hint_professor in interchangeable:
+                    professors[0] = hint_professor
+                professors.sort(key=lambda professor: professor != hint_professor)
+            candidates.append((time_slot != hint_slot, constrained, time_slot, rooms, professors))
+        candidates.sort(key=lambda candidate: candidate[:2])
+
+        for _, _, time_slot, rooms, professors in candidates:
+            for room in rooms:
+                for professor in professors:
+                    self.assign(course, professor, room, time_slot)
+                    if self.backtrack_mrv():
+                        return True
+                    self.unassign(course)
 
         return False
 
-    def solve(self):
-        if self.backtrack():
+    def optimize_energy(self, time_limit=None, on_incumbent=None, upper_bound=None):
+        """
+        Branch and bound for the schedule with the lowest energy usage (the sum
+        of the capacities of the rooms used), keeping any courses already in
+        the schedule. A node is pruned when its energy so far plus, for every
+        unscheduled course, the smallest capacity among the rooms it can still
+        use is no better than the best schedule found; that bound never
+        overestimates, so the result is optimal when the search completes.
+        Courses are branched on in MRV order and rooms tried smallest first.
+
+        Anytime: on_incumbent(schedule, energy) is called with every improving
+        schedule, and after time_limit seconds the best one so far is kept.
+        Returns (energy, optimal) and leaves the best schedule in self.schedule;
+        energy is None if there is no feasible schedule (or none was found in time).
+
+        upper_bound, if given, is polled every 64 nodes for the energy of the
+        best schedule known from elsewhere (or None), e.g. another solver
+        running alongside; only schedules that beat it are searched for, so
+        energy None with optimal True then means that schedule is optimal.
+        """
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        best = {"energy": None, "schedule": None, "outside": None if upper_bound is None else upper_bound()}
+
+        def ceiling():
+            known = [energy for energy in (best["energy"], best["outside"]) if energy is not None]
+            return min(known) if known else None
+
+        def search():
+            self._visit()
+            if deadline is not None and time.perf_counter() >= deadline:
+                raise SearchCancelled()  # Checked at every node, which costs far more than the clock
+            if upper_bound is not None and self.nodes % 64 == 0:
+                best["outside"] = upper_bound()
+            unscheduled = [course for course in self.courses if course not in self.schedule]
+            if not unscheduled:
+                if best["energy"] is None or self.energy_usage < best["energy"]:
+                    best["energy"], best["schedule"] = self.energy_usage, dict(self.schedule)
+                    if on_incumbent is not None:
+                        on_incumbent(dict(self.schedule), self.energy_usage)
+                return
+
+            room_options, professor_options = self._option_functions()
+            bound = self.energy_usage
+            blocked = {}
+            cheapest = {}  # Smallest capacity each unscheduled course can still get
+            course, best_key = None, None
+            for other in unscheduled:
+                blocked[other] = self._blocked_slots(other)
+                size = 0
+                for time_slot in self.time_slots:
+                    if time_slot in blocked[other]:
+                        continue
+                    rooms = room_options(other, time_slot)
+                    professors = professor_options(other, time_slot)
+                    if rooms and professors:
+                        size += len(rooms) * len(professors)
+                        smallest = min(self.room_capacity[room] for room in rooms)
+                        cheapest[other] = min(cheapest.get(other, smallest), smallest)
+                if size == 0:
+                    return
+                bound += cheapest[other]
+                degree = sum(1 for neighbour in self.conflict_map.get(other, ()) if neighbour not in self.schedule)
+                key = (size, -degree)
+                if best_key is None or key < best_key:
+                    course, best_key = other, key
+            limit = ceiling()
+            if limit is not None and bound >= limit:
+                return
+
+            # Cheapest room first, then least-constraining slot; one representative
+            # per interchangeable room class and professor, as in backtrack_mrv
+            neighbours = [other for other in self.conflict_map.get(course, ()) if other in blocked]
+            fixed_rooms = {
+                self.room_constraints[other] for other in unscheduled
+                if other != course and other in self.room_constraints
+            }
+            fixed_professors = {
+                self.professor_constraints[other] for other in unscheduled
+                if other != course and other in self.professor_constraints
+            }
+            candidates = []
+            for time_slot in self.time_slots:
+                if time_slot in blocked[course]:
+                    continue
+                professors = professor_options(course, time_slot)
+                if not professors:
+                    continue
+                interchangeable = [professor for professor in professors if professor not in fixed_professors]
+                professors = interchangeable[:1] + [professor for professor in professors if professor in fixed_professors]
+                constrained = sum(1 for other in neighbours if time_slot not in blocked[other])
+                representatives = {}
+                for room in room_options(course, time_slot):
+                    if room in fixed_rooms:
+                        representatives[room] = room
+                    else:
+                        representatives.setdefault(self.room_capacity[room], room)
+                for room in representatives.values():
+                    candidates.append((self.room_capacity[room], constrained, time_slot, room, professors))
+            candidates.sort(key=lambda candidate: candidate[:2])
+
+            for capacity, _, time_slot, room, professors in candidates:
+                limit = ceiling()
+                if limit is not None and bound - cheapest[course] + capacity >= limit:
+                    break  # Candidates only get more expensive from here
+                for professor in professors:
+                    self.assign(course, professor, room, time_slot)
+                    try:
+                        search()
+                    finally:
+                        self.unassign(course)
+
+        optimal = True
+        try:
+            with search_depth(len(self.courses)):
+                search()
+        except SearchCancelled:
+            optimal = False
+
+        if best["schedule"] is not None:
+            for course in list(self.schedule):
+                self.unassign(course)
+            for course, details in best["schedule"].items():
+                self.assign(course, details["professor"], details["room"], details["time_slot"])
+        return best["energy"], optimal
+
+    def _build_bitsets(self):
+        """
+        Encode every (slot, room, professor) value as one bit of a Python int.
+        Bit ((slot * n_rooms) + room) * n_professors + professor.
+        """
+        self.bit_rooms = [room["name"] for room in self.rooms]
+        self.bit_professors = list(self.professors)
+        n_rooms = len(self.bit_rooms)
+        n_professors = len(self.bit_professors)
+        slot_width = n_rooms * n_professors
+        room_block = (1 << n_professors) - 1
+        professor_stride = sum(1 << (room * n_professors) for room in range(n_rooms))
+
+        self.slot_mask = [((1 << slot_width) - 1) << (slot * slot_width) for slot in range(len(self.time_slots))]
+        self.room_slot_mask = [
+            [room_block << ((slot * n_rooms + room) * n_professors) for slot in range(len(self.time_slots))]
+            for room in range(n_rooms)
+        ]
+        self.professor_slot_mask = [
+            [professor_stride << (slot * slot_width + professor) for slot in range(len(self.time_slots))]
+            for professor in range(n_professors)
+        ]
+
+        room_index = {room: r for r, room in enumerate(self.bit_rooms)}
+        professor_index = {professor: p for p, professor in enumerate(self.bit_professors)}
+        self.bit_room_class = [self._room_class(room) for room in self.bit_rooms]
+        self.professor_mask = [sum(masks) for masks in self.professor_slot_mask]
+        available = 0
+        for p, professor in enumerate(self.bit_professors):
+            for s, time_slot in enumerate(self.time_slots):
+                if time_slot in self.professor_slots[professor]:
+                    available |= self.professor_slot_mask[p][s]
+
+        self.course_index = {course: i for i, course in enumerate(self.courses)}
+        self.bit_fixed_room = [-1] * len(self.courses)
+        self.bit_fixed_professor = [-1] * len(self.courses)
+        self.initial_domains = []
+        for i, course in enumerate(self.courses):
+            domain = available
+            if course in self.room_constraints:
+                r = room_index.get(self.room_constraints[course])
+                if r is None:
+                    domain = 0
+                else:
+                    self.bit_fixed_room[i] = r
+                    domain &= sum(self.room_slot_mask[r])
+            if course in self.professor_constraints:
+                p = professor_index.get(self.professor_constraints[course])
+                if p is None:
+                    domain = 0
+                else:
+                    self.bit_fixed_professor[i] = p
+                    domain &= self.professor_mask[p]
+            size = self.course_sizes.get(course, 0)
+            if size:
+                domain &= sum(
+                    sum(self.room_slot_mask[r]) for r, room in enumerate(self.bit_rooms)
+                    if self.room_capacity[room] >= size
+                )
+            self.initial_domains.append(domain)
+
+        self.bit_neighbours = [
+            [self.course_index[other] for other in self.conflict_map.get(course, ()) if other in self.course_index]
+            for course in self.courses
+        ]
+
+    def _decode_bit(self, value):
+        n_professors = len(self.bit_professors)
+        n_rooms = len(self.bit_rooms)
+        return value // (n_rooms * n_professors), (value // n_professors) % n_rooms, value % n_professors
+
+    def _slot_of(self, domain):
+        # Slot of the lowest remaining value
+        return ((domain & -domain).bit_length() - 1) // (len(self.bit_rooms) * len(self.bit_professors))
+
+    def _propagate(self, domains, queue):
+        """
+        AC-3 over the no_overlap arcs: a value of course a survives only if its
+        conflicting course b still has a value in another slot.
+        `queue` holds (a, b) arcs to revise. Returns False on a wipe-out.
+        """
+        while queue:
+            a, b = queue.pop()
+            domain_b = domains[b]
+            if not domain_b:
+                return False
+            slot = self._slot_of(domain_b)
+            if domain_b & ~self.slot_mask[slot]:
+                continue  # b has values in at least two slots, so every value of a is supported
+            revised = domains[a] & ~self.slot_mask[slot]
+            if revised != domains[a]:
+                if not revised:
+                    return False
+                domains[a] = revised
+                queue.extend((other, a) for other in self.bit_neighbours[a] if other != b)
+        return True
+
+    def _assign_bit(self, domains, assigned, i, value):
+        """
+        Fix course i to `value` and forward-check every other unassigned course.
+        Fails if `value` is no longer in the domain of course i.
+        """
+        if not domains[i] >> value & 1:
+            return False
+        slot, room, professor = self._decode_bit(value)
+        domains[i] = 1 << value
+        assigned[i] = True
+        exclude = ~(self.room_slot_mask[room][slot] | self.professor_slot_mask[professor][slot])
+        for other, domain in enumerate(domains):
+            if not assigned[other]:
+                domain &= exclude
+                if not domain:
+                    return False
+                domains[other] = domain
+        queue = []
+        for other in self.bit_neighbours[i]:
+            domains[other] &= ~self.slot_mask[slot]
+            if not domains[other]:
+                return False
+            queue.extend((neighbour, other) for neighbour in self.bit_neighbours[other])
+        return self._propagate(domains, queue)
+
+    def backtrack_bitset(self, domains, assigned):
+        """
+        MRV search over bitmask domains with forward checking and AC-3 propagation.
+        """
+        self._visit()
+        best, best_size = -1, None
+        for i, done in enumerate(assigned):
+            if not done:
+                size = domains[i].bit_count()
+                if best_size is None or size < best_size:
+                    best, best_size = i, size
+        if best < 0:
+            return domains
+        i = best
+
+        fixed_rooms = {
+            self.bit_fixed_room[other] for other, done in enumerate(assigned)
+            if not done and other != i and self.bit_fixed_room[other] >= 0
+        }
+        fixed_professors = 0
+        for p in {
+            self.bit_fixed_professor[other] for other, done in enumerate(assigned)
+            if not done and other != i and self.bit_fixed_professor[other] >= 0
+        }:
+            fixed_professors |= self.professor_mask[p]
+
+        # Least-constraining slot first, one representative per interchangeable room and professor
+        slots = [s for s in range(len(self.time_slots)) if domains[i] & self.slot_mask[s]]
+        slots.sort(key=lambda s: sum(
+            1 for other in self.bit_neighbours[i] if not assigned[other] and domains[other] & self.slot_mask[s]
+        ))
+        for s in slots:
+            tried_classes = set()
+            for r in range(len(self.bit_rooms)):
+                block = domains[i] & self.room_slot_mask[r][s]
+                if not block:
+                    continue
+                if r not in fixed_rooms:
+                    if self.bit_room_class[r] in tried_classes:
+                        continue
+                    tried_classes.add(self.bit_room_class[r])
+
+                fixed_block = block & fixed_professors
+                free_block = block & ~fixed_professors
+                values = [(free_block & -free_block).bit_length() - 1] if free_block else []
+                while fixed_block:
+                    lowest = fixed_block & -fixed_block
+                    values.append(lowest.bit_length() - 1)
+                    fixed_block ^= lowest
+
+                for value in values:
+                    new_domains = list(domains)
+                    new_assigned = list(assigned)
+                    if self._assign_bit(new_domains, new_assigned, i, value):
+                        result = self.backtrack_bitset(new_domains, new_assigned)
+                        if result is not None:
+                            return result
+        return None
+
+    def solve_bitset(self):
+        """
+        Solve with the bitmask engine, keeping any courses already in the schedule.
+        """
+        self._build_bitsets()
+        domains = list(self.initial_domains)
+        assigned = [False] * len(self.courses)
+        room_index = {room: r for r, room in enumerate(self.bit_rooms)}
+        professor_index = {professor: p for p, professor in enumerate(self.bit_professors)}
+        slot_index = {time_slot: s for s, time_slot in enumerate(self.time_slots)}
+        n_rooms, n_professors = len(self.bit_rooms), len(self.bit_professors)
+
+        # Pinned courses
+        for course, details in list(self.schedule.items()):
+            if course not in self.course_index:
+                continue
+            slot = slot_index.get(details["time_slot"])
+            room = room_index.get(details["room"])
+            professor = professor_index.get(details["professor"])
+            if slot is None or room is None or professor is None:
+                return False  # Pinned to a slot, room or professor that does not exist
+            value = (slot * n_rooms + room) * n_professors + professor
+            if not self._assign_bit(domains, assigned, self.course_index[course], value):
+                return False
+
+        queue = [(a, b) for a in range(len(self.courses)) for b in self.bit_neighbours[a]]
+        if not self._propagate(domains, queue):
+            return False
+
+        result = self.backtrack_bitset(domains, assigned)
+        if result is None:
+            return False
+
+        for i, course in enumerate(self.courses):
+            if course not in self.schedule:
+                slot, room, professor = self._decode_bit(result[i].bit_length() - 1)
+                self.assign(course, self.bit_professors[professor], self.bit_rooms[room], self.time_slots[slot])
+        return True
+
+    def split_prefixes(self, min_tasks, max_depth=3):
+        """
+        Enumerate partial assignments of the most constrained courses to use as
+        independent subtrees. Goes one course deeper at a time until there are at
+        least `min_tasks` prefixes (or `max_depth` is reached).
+        Only one representative per interchangeable professor and room is generated.
+        """
+        order = sorted(
+            (course for course in self.courses if course not in self.schedule),
+            key=lambda course: -len(self.conflict_map.get(course, ())),
+        )
+        fixed_rooms = set(self.room_constraints.values())
+        fixed_professors = set(self.professor_constraints.values())
+        prefixes = [[]]
+        for course in order[:max_depth]:
+            extended = []
+            for prefix in prefixes:
+                for assigned_course, professor, room, time_slot in prefix:
+                    self.assign(assigned_course, professor, room, time_slot)
+                for time_slot in self.time_slots:
+                    tried_classes = set()
+                    for room in self.rooms:
+                        interchangeable = room["name"] not in fixed_rooms
+                        room_class = self._room_class(room["name"])
+                        if interchangeable and room_class in tried_classes:
+                            continue
+                        tried_professor = False
+                        for professor in self.professors:
+                            free = professor not in fixed_professors
+                            if free and tried_professor:
+                                continue
+                            if self.is_valid_assignment(course, professor, room["name"], time_slot):
+                                extended.append(prefix + [(course, professor, room["name"], time_slot)])
+                                if interchangeable:
+                                    tried_classes.add(room_class)
+                                tried_professor = tried_professor or free
+                for assigned_course, _, _, _ in prefix:
+                    self.unassign(assigned_course)
+            prefixes = extended
+            if len(prefixes) >= min_tasks or not prefixes:
+                break
+        return prefixes
+
+    def solve_parallel(self, workers=None, tasks_per_worker=4, max_depth=3):
+        """
+        Run the bitset search on independent subtrees in a process pool.
+        The pool's shared task queue hands the next subtree to whichever worker
+        is idle; the first feasible schedule cancels every other subtree.
+        """
+        workers = workers or os.cpu_count() or 1
+        prefixes = self.split_prefixes(workers * tasks_per_worker, max_depth)
+        if not prefixes:
+            return False
+
+        stop_event = multiprocessing.Event()
+        arguments = (self.courses, self.professors, self.rooms, self.time_slots, self.constraints, self.schedule)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_subtree_worker,
+            initargs=(arguments, stop_event),
+        ) as executor:
+            pending = {executor.submit(_solve_subtree, prefix) for prefix in prefixes}
+            result = None
+            while pending and result is None:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.result() is not None:
+                        result = future.result()
+                        break
+            stop_event.set()
+            for future in pending:
+                future.cancel()
+
+        if result is None:
+            return False
+        for course, details in result.items():
+            if course not in self.schedule:
+                self.assign(course, details["professor"], details["room"], details["time_slot"])
+        return True
+
+    def solve(self, engine="basic"):
+        """
+        Schedule every course.
+        engine="basic" tries courses in the given order; engine="mrv" uses
+        MRV/LCV ordering with forward checking; engine="bitset" runs the same
+        search over bitmask domains with AC-3 propagation; engine="parallel"
+        splits the bitset search across a process pool; engine="energy" searches
+        for the lowest-energy schedule (see optimize_energy) and, if should_stop
+        fires first, returns the best one found so far.
+        """
+        engines = {
+            "basic": self.backtrack,
+            "mrv": self.backtrack_mrv,
+            "bitset": self.solve_bitset,
+            "parallel": self.solve_parallel,
+            "energy": lambda: self.optimize_energy()[0] is not None,
+        }
+        if engine not in engines:
+            raise ValueError(f"Unknown engine: {engine}")
+        try:
+            with span(self.recorder, f"backtracking.{engine}", courses=len(self.courses)):
+                with search_depth(len(self.courses)):
+                    found = engines[engine]()
+        except SearchCancelled:
+            found = False
+
+        if found:
             energy_savings = self.calculate_energy_savings()
             return self.schedule, energy_savings
         else:
             return "No feasible solution found", 0
 
 
+def solve_problem(problem, engine="basic", time_limit=None, recorder=None):
+    """
+    Solve a shared Problem; returns the schedule, or {} if there is no feasible
+    one or none was found within time_limit seconds (not enforced by the
+    "parallel" engine's workers). recorder is an optional instrumentation.Recorder.
+    """
+    timetabling = Timetabling.from_problem(problem)
+    if recorder is not None:
+        timetabling.instrument(recorder)
+    if time_limit is not None:
+        deadline = time.perf_counter() + time_limit
+        timetabling.should_stop = lambda: time.perf_counter() >= deadline
+    schedule, _ = timetabling.solve(engine)
+    return schedule if isinstance(schedule, dict) else {}
+
+
+def _counted_search(search, recorder):
+    def counted(*args):
+        recorder.count("backtracking.nodes")
+        result = search(*args)
+        if result is False or result is None:
+            recorder.count("backtracking.backtracks")
+        return result
+
+    return counted
+
+
+# Parallel subtree workers
+_subtree_arguments = None
+_subtree_stop_event = None
+
+
+def _init_subtree_worker(arguments, stop_event):
+    global _subtree_arguments, _subtree_stop_event
+    _subtree_arguments = arguments
+    _subtree_stop_event = stop_event
+
+
+def _solve_subtree(prefix):
+    """
+    Solve one subtree in a worker process; returns the schedule or None.
+    """
+    if _subtree_stop_event.is_set():
+        return None
+    courses, professors, rooms, time_slots, constraints, pinned = _subtree_arguments
+    timetabling = Timetabling(courses, professors, rooms, time_slots, constraints)
+    timetabling.should_stop = _subtree_stop_event.is_set
+    for course, details in pinned.items():
+        timetabling.assign(course, details["professor"], details["room"], details["time_slot"])
+    for course, professor, room, time_slot in prefix:
+        timetabling.assign(course, professor, room, time_slot)
+    try:
+        with search_depth(len(courses)):
+            if timetabling.solve_bitset():
+                return timetabling.schedule
+    except SearchCancelled:
+        pass
+    return None
+
+
 # Example Input
 courses = ["Math101", "CS102", "Bio201"]
 professors = {
@@ -91,16 +873,24 @@ constraints = {
     "no_overlap": [("CS102", "Bio201")]
 }
 
-# Solve Timetabling
-timetabling = Timetabling(courses, professors, rooms, time_slots, constraints)
-solution, energy_savings = timetabling.solve()
-
-# Output
-print("Generated Timetable:")
-if solution != "No feasible solution found":
-    for course, details in solution.items():
-        print(f"{details['time_slot']}: {course} in {details['room']} with {details['professor']}")
-    print(f"Energy Savings: {energy_savings}%")
-else:
-    print(solution)
-        
\ No newline at end of file
+if __name__ == "__main__":
+    # Solve Timetabling
+    timetabling = Timetabling(courses, professors, rooms, time_slots, constraints)
+    solution, energy_savings = timetabling.solve()
+
+    # Output
+    print("Generated Timetable:")
+    if solution != "No feasible solution found":
+        for course, details in solution.items():
+            print(f"{details['time_slot']}: {course} in {details['room']} with {details['professor']}")
+        print(f"Energy Savings: {energy_savings}%")
+    else:
+        print(solution)
+
+    # Lowest-energy timetable
+    timetabling = Timetabling(courses, professors, rooms, time_slots, constraints)
+    energy, optimal = timetabling.optimize_energy(
+        time_limit=10, on_incumbent=lambda schedule, energy: print(f"Found a timetable using {energy}")
+    )
+    if energy is not None:
+        print(f"Energy Savings: {timetabling.calculate_energy_savings()}% ({'optimal' if optimal else 'best found'})")
@@ -0,0 +1,215 @@
+import argparse
+import contextlib
+import io
+import json
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+import backtracking
+import genetic
+import genetic_vectorized
+import graph_bfs
+import graph_dfs
+import graph_dsatur
+import greedy_dp
+import local_search
+from instances import generate_instance
+
+# Instance sizes (courses) run by default, smallest first
+default_sizes = [100, 300, 1000]
+
+# Regression thresholds: a result regresses when it is this much slower (or
+# uses this much more memory) than the baseline and also past the noise floors
+default_tolerance = 0.5
+time_floor = 0.05  # Seconds
+memory_floor = 1 << 20  # Bytes
+
+
+def solvers(time_limit=10.0):
+    """
+    Every solver as a function problem -> schedule dict.
+    time_limit caps the solvers that support one (genetic and backtracking).
+    """
+    return {
+        "genetic": lambda problem: genetic.solve_problem(problem, time_limit=time_limit),
+        "genetic_vectorized": lambda problem: genetic_vectorized.solve_problem(problem, seed=0),
+        "backtracking": lambda problem: backtracking.solve_problem(problem, "mrv", time_limit=time_limit),
+        "backtracking_energy": lambda problem: backtracking.solve_problem(problem, "energy", time_limit=time_limit),
+        "greedy_dp": greedy_dp.solve_problem,
+        "greedy_matching": lambda problem: greedy_dp.solve_problem(problem, "matching"),
+        "bfs": graph_bfs.solve_problem,
+        "dfs": graph_dfs.solve_problem,
+        "dsatur": graph_dsatur.solve_problem,
+        "anneal": lambda problem: local_search.solve_problem(problem, "anneal", seed=0),
+        "tabu": lambda problem: local_search.solve_problem(problem, "tabu", seed=0),
+    }
+
+
+def measure(problem, solve, repeat=1):
+    """
+    Run one solver on one problem: `repeat` timed runs (the fastest counts),
+    then one under tracemalloc, which slows Python code down too much to time
+    it in the same run. Returns the result record.
+    """
+    record = {"courses": len(problem.courses)}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):  # Solvers print their progress
+            for _ in range(repeat):
+                start = time.perf_counter()
+                schedule = solve(problem)
+                elapsed = time.perf_counter() - start
+                record["time"] = min(record.get("time", elapsed), elapsed)
+
+            tracemalloc.start()
+            try:
+                solve(problem)
+                record["peak_memory"] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    except Exception as error:  # A failing solver is reported, not fatal
+        record["error"] = f"{type(error).__name__}: {error}"
+        return record
+
+    record.update(quality(problem, schedule))
+    return record
+
+
+def quality(problem, schedule):
+    """
+    Hard-constraint violations, scheduled courses, distinct time slots used
+    and room utilization (seats taken / seats offered by the rooms in use).
+    """
+    violations = problem.violations(schedule)
+    seats = offered = 0
+    for course, assignment in schedule.items():
+        i = problem.course_index.get(course)
+        r = problem.room_index.get(assignment.get("room"))
+        if i is not None and r is not None:
+            seats += int(problem.students[i])
+            offered += int(problem.capacity[r])
+    return {
+        "violations": len(violations),
+        "violation_kinds": dict(Counter(kind for kind, _ in violations)),
+        "scheduled": len(schedule),
+        "slots_used": len({assignment.get("time_slot") for assignment in schedule.values()}),
+        "utilization": round(seats / offered, 4) if offered else 0.0,
+    }
+
+
+def run(sizes=None, names=None, seed=0, time_limit=10.0, repeat=1, progress=None):
+    """
+    Run the selected solvers on generated instances of each size.
+    Returns one record per (solver, size); progress, if given, is called with each.
+    """
+    sizes = default_sizes if sizes is None else sizes
+    available = solvers(time_limit)
+    names = list(available) if names is None else names
+    for name in names:
+        if name not in available:
+            raise ValueError(f"Unknown solver: {name}")
+
+    records = []
+    for size in sizes:
+        problem = generate_instance(size, seed=seed)
+        for name in names:
+            random.seed(seed)  # genetic.py draws from the global RNG
+            record = {"solver": name, "seed": seed, **measure(problem, available[name], repeat)}
+            records.append(record)
+            if progress is not None:
+                progress(record)
+    return records
+
+
+def compare(records, baseline, tolerance=default_tolerance):
+    """
+    Compare results with a baseline run of the same solvers and sizes.
+    Returns a list of human-readable regressions (empty if there are none).
+    """
+    previous = {(record["solver"], record["courses"]): record for record in baseline}
+    regressions = []
+    for record in records:
+        key = (record["solver"], record["courses"])
+        old = previous.get(key)
+        if old is None:
+            continue
+        label = f"{record['solver']} @ {record['courses']} courses"
+        if "error" in record and "error" not in old:
+            regressions.append(f"{label}: now fails ({record['error']})")
+            continue
+        if "error" in record or "error" in old:
+            continue
+        if record["time"] > old["time"] * (1 + tolerance) and record["time"] - old["time"] > time_floor:
+            regressions.append(f"{label}: time {old['time']:.3f}s -> {record['time']:.3f}s")
+        if (
+            record["peak_memory"] > old["peak_memory"] * (1 + tolerance)
+            and record["peak_memory"] - old["peak_memory"] > memory_floor
+        ):
+            regressions.append(
+                f"{label}: peak memory {old['peak_memory'] / 1e6:.1f}MB -> {record['peak_memory'] / 1e6:.1f}MB"
+            )
+        if record["violations"] > old["violations"]:
+            regressions.append(f"{label}: violations {old['violations']} -> {record['violations']}")
+    return regressions
+
+
+def summary(records):
+    """
+    Format the results as a fixed-width table.
+    """
+    header = f"{'solver':<20}{'courses':>8}{'time (s)':>10}{'peak MB':>9}{'violations':>12}{'slots':>7}{'util':>7}"
+    lines = [header, "-" * len(header)]
+    for record in records:
+        if "error" in record:
+            lines.append(f"{record['solver']:<20}{record['courses']:>8}  {record['error']}")
+        else:
+            lines.append(
+                f"{record['solver']:<20}{record['courses']:>8}{record['time']:>10.3f}"
+                f"{record['peak_memory'] / 1e6:>9.1f}{record['violations']:>12}"
+                f"{record['slots_used']:>7}{record['utilization']:>7.2f}"
+            )
+    return "\n".join(lines)
+
+
+def read_records(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every timetabling solver on generated instances.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=default_sizes, help="instance sizes (courses)")
+    parser.add_argument("--solvers", nargs="+", choices=list(solvers()), help="solvers to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0, help="instance and solver seed")
+    parser.add_argument("--time-limit", type=float, default=10.0, help="seconds for genetic and backtracking")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per solver; the fastest counts")
+    parser.add_argument("--output", help="write the results here as JSON lines")
+    parser.add_argument("--baseline", help="JSON-lines results to compare against; exit 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=default_tolerance, help="allowed slowdown, e.g. 0.5 for 50%")
+    args = parser.parse_args(argv)
+
+    def progress(record):
+        status = record.get("error") or f"{record['time']:.3f}s, {record['violations']} violations"
+        print(f"{record['solver']} @ {record['courses']} courses: {status}", file=sys.stderr)
+
+    records = run(args.sizes, args.solvers, args.seed, args.time_limit, args.repeat, progress)
+    if args.output:
+        with open(args.output, "w") as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+    print(summary(records))
+
+    if args.baseline:
+        regressions = compare(records, read_records(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
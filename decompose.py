@@ -0,0 +1,257 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import backtracking
+import genetic
+import graph_bfs
+import graph_dfs
+import graph_dsatur
+import greedy_dp
+import local_search
+from problem import Problem
+from repair import resolve
+
+# Solvers a part may be solved with, as functions (problem, **options) -> schedule
+solvers = {
+    "genetic": genetic.solve_problem,
+    "backtracking": backtracking.solve_problem,
+    "bfs": graph_bfs.solve_problem,
+    "dfs": graph_dfs.solve_problem,
+    "dsatur": graph_dsatur.solve_problem,
+    "greedy_dp": greedy_dp.solve_problem,
+    "local_search": local_search.solve_problem,
+}
+
+
+def components(problem):
+    """
+    Group the courses that have to be solved together: courses joined by a
+    conflict or sharing a fixed professor end up in one group. (A fixed room
+    does not join its courses; see partition_resources.)
+    Returns one component label per course (0, 1, ... in order of first course).
+    """
+    parent = list(range(len(problem.courses)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]  # Path halving
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        i, j = find(i), find(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)
+
+    for a, b in problem.conflict_pairs.tolist():
+        union(a, b)
+    first = {}
+    for i, professor in enumerate(problem.fixed_professor.tolist()):
+        if professor >= 0:
+            union(i, first.setdefault(professor, i))
+
+    roots = [find(i) for i in range(len(parent))]
+    labels = {}
+    return np.array([labels.setdefault(root, len(labels)) for root in roots], dtype=np.int64)
+
+
+def partition_resources(problem, component):
+    """
+    Share the rooms and professors out among the components, so that parts
+    solved on their own cannot clash. Fixed professors go to the component of
+    their courses, and a fixed room to the component with the most courses
+    fixed to it. The other rooms are handed out largest first, each to the
+    component with the largest course that still lacks a room (then the most
+    such courses); a room counts for as many courses as it has time slots.
+    The other professors go to the components with courses that have no fixed
+    professor, in proportion to those courses' slots still uncovered. Returns (room owner, professor owner) arrays of component
+    labels, -1 for resources nobody needs.
+    """
+    n_components = int(component.max()) + 1 if len(component) else 0
+    n_slots = len(problem.time_slots)
+    professor_owner = np.full(len(problem.professors), -1, dtype=np.int64)
+    fixed_room, fixed_professor = problem.fixed_room, problem.fixed_professor
+    fixed = fixed_room >= 0
+    votes = np.zeros((len(problem.rooms), n_components), dtype=np.int64)
+    np.add.at(votes, (fixed_room[fixed], component[fixed]), 1)
+    room_owner = np.where(votes.any(axis=1), votes.argmax(axis=1), -1)
+    professor_owner[fixed_professor[fixed_professor >= 0]] = component[fixed_professor >= 0]
+
+    # Sizes of each component's courses still without a room, largest first
+    waiting = [[] for _ in range(n_components)]
+    for i in np.argsort(-problem.students, kind="stable").tolist():
+        if fixed_room[i] < 0 or room_owner[fixed_room[i]] != component[i]:
+            waiting[component[i]].append(int(problem.students[i]))
+    cells = np.zeros(n_components, dtype=np.int64)
+    for r in np.flatnonzero(room_owner >= 0).tolist():
+        # Slots left over in a fixed room take the largest courses that fit
+        c = room_owner[r]
+        spare = n_slots - int(votes[r].sum())
+        fits = [size for size in waiting[c] if size <= problem.capacity[r]][:max(spare, 0)]
+        for size in fits:
+            waiting[c].remove(size)
+        cells[c] += n_slots
+
+    for r in np.argsort(-problem.capacity, kind="stable").tolist():
+        if room_owner[r] >= 0:
+            continue
+        capacity = int(problem.capacity[r])
+        smaller = problem.capacity[(room_owner < 0) & (problem.capacity < capacity)]
+        next_capacity = int(smaller.max()) if len(smaller) else 0
+        for sizes in waiting:
+            while sizes and sizes[0] > capacity:
+                sizes.pop(0)  # Too large for every room left; repaired after the merge
+        needy = [c for c in range(n_components) if waiting[c]]
+        if needy:
+            # Courses too large for the next smaller rooms get this one or none
+            c = max(needy, key=lambda c: (
+                min(sum(1 for size in waiting[c][:n_slots] if size > next_capacity), n_slots), len(waiting[c])
+            ))
+            del waiting[c][:n_slots]
+        else:
+            # Every course is covered: spare rooms go where they are scarcest
+            sizes = np.bincount(component, minlength=n_components)
+            c = int(np.argmax(sizes / (cells + 1)))
+        room_owner[r] = c
+        cells[c] += n_slots
+
+    # Slots still to cover per component: one per course without a fixed professor
+    need = np.bincount(component[fixed_professor < 0], minlength=n_components).astype(float)
+    for p in np.argsort(-problem.available.sum(axis=1), kind="stable").tolist():
+        if professor_owner[p] < 0 and need.max() > 0:
+            c = int(np.argmax(need))
+            professor_owner[p] = c
+            need[c] -= problem.available[p].sum()
+    return room_owner, professor_owner
+
+
+def subproblem(problem, course_ids, room_ids, professor_ids):
+    """
+    The part of `problem` with only these courses, rooms and professors (ID
+    arrays). A fixed room or professor outside the part is no longer fixed.
+    """
+    def remap(ids, size):
+        new = np.full(size + 1, -1, dtype=np.int64)  # Index -1 (not fixed) stays -1
+        new[ids] = np.arange(len(ids))
+        return new
+
+    course_map = remap(course_ids, len(problem.courses))
+    pairs = course_map[problem.conflict_pairs]
+    pairs = pairs[(pairs >= 0).all(axis=1)]
+    return Problem(
+        [problem.courses[i] for i in course_ids.tolist()],
+        [problem.rooms[r] for r in room_ids.tolist()],
+        problem.time_slots,
+        [problem.professors[p] for p in professor_ids.tolist()],
+        problem.students[course_ids],
+        problem.capacity[room_ids],
+        remap(room_ids, len(problem.rooms))[problem.fixed_room[course_ids]],
+        remap(professor_ids, len(problem.professors))[problem.fixed_professor[course_ids]],
+        problem.available[professor_ids],
+        pairs,
+    )
+
+
+def decompose(problem, min_courses=50):
+    """
+    Split `problem` into independent parts: its components, with the rooms and
+    professors partitioned between them (see partition_resources). Components
+    smaller than min_courses are packed together, so a process is not started
+    for every lone course. A course fixed to a room that went to another part,
+    or too large for every room of its part, is left out of every part;
+    solve_decomposed() places it after the merge.
+    Returns a list of Problems, largest first.
+    """
+    component = components(problem)
+    room_owner, professor_owner = partition_resources(problem, component)
+    n_components = int(component.max()) + 1 if len(component) else 0
+    sizes = np.bincount(component, minlength=n_components)
+
+    # Pack the components, largest first, into parts of at least min_courses
+    group_of = np.zeros(n_components, dtype=np.int64)
+    n_groups, filled = 0, 0
+    for c in np.argsort(-sizes, kind="stable").tolist():
+        group_of[c] = n_groups
+        filled += sizes[c]
+        if filled >= min_courses:
+            n_groups, filled = n_groups + 1, 0
+    if filled:
+        n_groups += 1
+
+    group = group_of[component]
+    largest_room = np.zeros(n_groups, dtype=np.int64)
+    np.maximum.at(largest_room, group_of[room_owner[room_owner >= 0]], problem.capacity[room_owner >= 0])
+    held_back = (problem.fixed_room >= 0) & (group != group_of[room_owner[problem.fixed_room]])
+    held_back |= problem.students > largest_room[group]
+    return [
+        subproblem(
+            problem,
+            np.flatnonzero((group == g) & ~held_back),
+            np.flatnonzero((room_owner >= 0) & (group_of[room_owner] == g)),
+            np.flatnonzero((professor_owner >= 0) & (group_of[professor_owner] == g)),
+        )
+        for g in range(n_groups)
+    ]
+
+
+def _init_worker():
+    sys.stdout = open(os.devnull, "w")  # Solvers print their progress
+
+
+def _solve_part(solver, part, options):
+    return solvers[solver](part, **options)
+
+
+def solve_decomposed(problem, solver="backtracking", workers=None, min_courses=50,
+                     repair="tabu", repair_time_limit=None, repair_seed=None, **options):
+    """
+    Decompose `problem`, solve the parts with `solver` (a name in `solvers`,
+    given `options`) in a pool of `workers` processes, merge their schedules
+    and repair what is left against the whole instance: the courses held back,
+    left unscheduled by their part or scheduled with a violation.
+    repair="tabu" or "anneal" places them at their cheapest slot and room and
+    runs that local search (see local_search.LocalSearch) from the merged
+    schedule; a Timetabling engine ("mrv", ...) re-solves them with
+    repair.resolve(), moving as few other courses as it can, which suits a
+    handful of courses better than hundreds. repair_time_limit caps the repair
+    in seconds and repair_seed seeds it. workers=1 solves the parts one after
+    another in this process. Returns the schedule.
+    """
+    if solver not in solvers:
+        raise ValueError(f"Unknown solver: {solver}")
+    parts = decompose(problem, min_courses)
+    schedule = {}
+    if len(parts) == 1 or workers == 1:
+        for part in parts:
+            schedule.update(solvers[solver](part, **options) or {})
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(parts)),
+                                 initializer=_init_worker) as pool:
+            for result in pool.map(_solve_part, [solver] * len(parts), parts, [options] * len(parts)):
+                schedule.update(result or {})
+
+    invalid = {course for _, course in problem.violations(schedule) if course in problem.course_index}
+    if not invalid:
+        return schedule
+    if repair in ("tabu", "anneal"):
+        search = local_search.LocalSearch(problem, schedule, repair_seed)
+        getattr(search, repair)(time_limit=repair_time_limit)
+        return search.schedule()
+    return resolve(problem, schedule, invalid, engine=repair, time_limit=repair_time_limit or 1.0)
+
+
+if __name__ == "__main__":
+    from instances import generate_instance
+
+    # Five faculties that share the rooms but no students or staff
+    problem = generate_instance(900, seed=0, cross_faculty=0, room_scarcity=0.5)
+    parts = decompose(problem)
+    print(f"{problem} splits into {len(parts)} parts of {[len(part.courses) for part in parts]} courses")
+    start = time.perf_counter()
+    schedule = solve_decomposed(problem, "backtracking", repair_seed=0, engine="mrv", time_limit=60)
+    elapsed = time.perf_counter() - start
+    print(f"Decomposed: {elapsed:.2f}s, {len(schedule)} scheduled, {len(problem.violations(schedule))} violations")
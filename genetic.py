@@ -1,4 +1,13 @@
+import hashlib
+import os
+import pickle
 import random
+import statistics
+import tempfile
+import time
+import zlib
+
+from problem import to_genetic
 
 # Define problem parameters
 courses = ["Math101", "CS102", "Bio201"]
@@ -39,39 +48,49 @@ mutation_rate = 0.1
 generations = 100
 
 
+def random_assignment(course):
+    """
+    Draw a random (room, time_slot, professor) assignment for one course.
+    Ensures that room assignments and professor availability constraints are respected.
+    """
+    # Handle room assignments based on constraints
+    if course in constraints["room_assignment"]:
+        room = constraints["room_assignment"][course]
+    else:
+        room = random.choice(list(rooms.keys()))
+
+    # A fixed professor (optional constraint) teaches in one of their own slots
+    required_professor = constraints.get("professor_assignment", {}).get(course)
+    if required_professor is not None:
+        time_slot = random.choice(constraints["professor_availability"].get(required_professor) or time_slots)
+        return {"room": room, "time_slot": time_slot, "professor": required_professor}
+
+    # Assign a random time slot
+    time_slot = random.choice(time_slots)
+
+    # Assign a professor based on availability
+    possible_professors = [
+        p for p in professors if time_slot in constraints["professor_availability"].get(p, [])
+    ]
+    if not possible_professors:
+        # If no professor is available, assign randomly (fitness will penalize)
+        professor = random.choice(professors)
+    else:
+        professor = random.choice(possible_professors)
+
+    return {
+        "room": room,
+        "time_slot": time_slot,
+        "professor": professor
+    }
+
+
 def create_chromosome():
     """
     Create a single timetable (chromosome).
     Each course is assigned a (room, time_slot, professor) triple.
-    Ensures that room assignments and professor availability constraints are respected.
     """
-    chromosome = {}
-    for course in courses:
-        # Handle room assignments based on constraints
-        if course in constraints["room_assignment"]:
-            room = constraints["room_assignment"][course]
-        else:
-            room = random.choice(list(rooms.keys()))
-
-        # Assign a random time slot
-        time_slot = random.choice(time_slots)
-
-        # Assign a professor based on availability
-        possible_professors = [
-            p for p in professors if time_slot in constraints["professor_availability"].get(p, [])
-        ]
-        if not possible_professors:
-            # If no professor is available, assign randomly (fitness will penalize)
-            professor = random.choice(professors)
-        else:
-            professor = random.choice(possible_professors)
-
-        chromosome[course] = {
-            "room": room,
-            "time_slot": time_slot,
-            "professor": professor
-        }
-    return chromosome
+    return {course: random_assignment(course) for course in courses}
 
 
 def calculate_fitness(chromosome):
@@ -87,6 +106,11 @@ def calculate_fitness(chromosome):
         if chromosome.get(course, {}).get("room") != assigned_room:
             fitness -= 5  # Penalty for incorrect room assignment
 
+    # 1b. Fixed Professor Assignments (Optional)
+    for course, assigned_professor in constraints.get("professor_assignment", {}).items():
+        if chromosome.get(course, {}).get("professor") != assigned_professor:
+            fitness -= 5  # Penalty for the wrong professor
+
     # 2. Professor Availability Constraints
     for course, assignment in chromosome.items():
         prof = assignment["professor"]
@@ -132,23 +156,173 @@ def calculate_fitness(chromosome):
     return fitness
 
 
-def selection(population):
+# Lookup tables for delta evaluation, rebuilt by build_indexes()
+_available_slots = {}
+_conflict_partners = {}
+
+
+def build_indexes():
     """
-    Perform weighted random selection based on fitness.
-    Returns two parents for crossover.
+    Precompute the lookups used to rescore single courses.
+    Must be called again whenever the problem parameters above change.
+    """
+    _available_slots.clear()
+    for prof, slots in constraints["professor_availability"].items():
+        _available_slots[prof] = set(slots)
+
+    _conflict_partners.clear()
+    for course1, course2 in constraints["course_conflicts"]:
+        if course1 != course2:
+            _conflict_partners.setdefault(course1, []).append(course2)
+            _conflict_partners.setdefault(course2, []).append(course1)
+
+
+def load_problem(problem):
+    """
+    Replace the problem parameters above with a shared Problem (see problem.py).
+    """
+    global courses, professors, rooms, time_slots, constraints
+    courses, professors, rooms, time_slots, constraints = to_genetic(problem)
+    build_indexes()
+
+
+class Individual:
+    """
+    A chromosome stored together with its fitness and the occupancy counters
+    (professor/slot and room/slot) needed to rescore one course at a time.
+    """
+    __slots__ = ("chromosome", "fitness", "prof_timeslot_count", "room_usage")
+
+    def __init__(self, chromosome, fitness, prof_timeslot_count, room_usage):
+        self.chromosome = chromosome
+        self.fitness = fitness
+        self.prof_timeslot_count = prof_timeslot_count
+        self.room_usage = room_usage
+
+    def copy(self):
+        # Assignments are replaced, never edited in place, so they can be shared
+        return Individual(
+            dict(self.chromosome),
+            self.fitness,
+            dict(self.prof_timeslot_count),
+            dict(self.room_usage),
+        )
+
+
+def evaluate(chromosome):
+    """
+    Fully evaluate a chromosome and wrap it in an Individual.
+    """
+    prof_timeslot_count = {}
+    room_usage = {}
+    for course, assignment in chromosome.items():
+        key = (assignment["professor"], assignment["time_slot"])
+        prof_timeslot_count[key] = prof_timeslot_count.get(key, 0) + 1
+        if "room_capacity_constraints" in constraints:
+            key = (assignment["room"], assignment["time_slot"])
+            room_usage[key] = room_usage.get(key, 0) + constraints["room_capacity_constraints"].get(course, 0)
+    return Individual(chromosome, calculate_fitness(chromosome), prof_timeslot_count, room_usage)
+
+
+def _course_penalty(individual, course, assignment):
+    """
+    Penalty contributed by one course's assignment, given the rest of the chromosome.
+    Counts its own room/availability violations plus its share of every pairwise
+    penalty (conflicts, professor clashes, room overload), so that removing and
+    re-adding the course changes the fitness by exactly the right amount.
+    """
+    penalty = 0
+    slot = assignment["time_slot"]
+
+    required_room = constraints["room_assignment"].get(course)
+    if required_room is not None and assignment["room"] != required_room:
+        penalty += 5
+
+    required_professor = constraints.get("professor_assignment", {}).get(course)
+    if required_professor is not None and assignment["professor"] != required_professor:
+        penalty += 5
+
+    if slot not in _available_slots.get(assignment["professor"], ()):
+        penalty += 5
+
+    chromosome = individual.chromosome
+    for other in _conflict_partners.get(course, ()):
+        if other in chromosome and chromosome[other]["time_slot"] == slot:
+            penalty += 5
+
+    return penalty
+
+
+def _remove_course(individual, course):
+    assignment = individual.chromosome[course]
+    individual.fitness += _course_penalty(individual, course, assignment)
+
+    key = (assignment["professor"], assignment["time_slot"])
+    count = individual.prof_timeslot_count[key]
+    if count > 1:
+        individual.fitness += 5
+        individual.prof_timeslot_count[key] = count - 1
+    else:
+        del individual.prof_timeslot_count[key]
+
+    if "room_capacity_constraints" in constraints:
+        key = (assignment["room"], assignment["time_slot"])
+        capacity = rooms.get(assignment["room"], 0)
+        load = individual.room_usage[key]
+        new_load = load - constraints["room_capacity_constraints"].get(course, 0)
+        individual.fitness += 5 * (max(load - capacity, 0) - max(new_load - capacity, 0))
+        individual.room_usage[key] = new_load
+
+
+def _add_course(individual, course, assignment):
+    individual.fitness -= _course_penalty(individual, course, assignment)
+    individual.chromosome[course] = assignment
+
+    key = (assignment["professor"], assignment["time_slot"])
+    count = individual.prof_timeslot_count.get(key, 0)
+    if count > 0:
+        individual.fitness -= 5
+    individual.prof_timeslot_count[key] = count + 1
+
+    if "room_capacity_constraints" in constraints:
+        key = (assignment["room"], assignment["time_slot"])
+        capacity = rooms.get(assignment["room"], 0)
+        load = individual.room_usage.get(key, 0)
+        new_load = load + constraints["room_capacity_constraints"].get(course, 0)
+        individual.fitness -= 5 * (max(new_load - capacity, 0) - max(load - capacity, 0))
+        individual.room_usage[key] = new_load
+
+
+def reassign(individual, course, assignment):
     """
-    fitness_values = [calculate_fitness(chromosome) for chromosome in population]
+    Replace one course's assignment and update the cached fitness by the delta.
+    """
+    _remove_course(individual, course)
+    _add_course(individual, course, assignment)
+
 
-    # Ensure all fitness values are positive
+def roulette_weights(fitness_values):
+    """
+    Shift fitness values so that all roulette-wheel weights are positive.
+    """
     min_fitness = min(fitness_values)
     if min_fitness <= 0:
         offset = 1 - min_fitness
-        adjusted_fitness = [f + offset for f in fitness_values]
-    else:
-        adjusted_fitness = fitness_values.copy()
+        return [f + offset for f in fitness_values]
+    return list(fitness_values)
+
+
+def selection(population, weights=None):
+    """
+    Perform weighted random selection based on fitness.
+    Returns two parents for crossover.
+    Pass precomputed roulette weights to avoid re-evaluating the population.
+    """
+    if weights is None:
+        weights = roulette_weights([calculate_fitness(chromosome) for chromosome in population])
 
     # Select two parents based on adjusted fitness
-    parents = random.choices(population, weights=adjusted_fitness, k=2)
+    parents = random.choices(population, weights=weights, k=2)
     return parents[0], parents[1]
 
 
@@ -173,73 +347,250 @@ def mutate(chromosome):
     """
     for course in courses:
         if random.random() < mutation_rate:
-            # Handle room assignments based on constraints
-            if course in constraints["room_assignment"]:
-                chromosome[course]["room"] = constraints["room_assignment"][course]
-            else:
-                chromosome[course]["room"] = random.choice(list(rooms.keys()))
-
-            # Assign a new time slot
-            new_slot = random.choice(time_slots)
-            chromosome[course]["time_slot"] = new_slot
-
-            # Assign a professor based on new time slot availability
-            possible_professors = [
-                p for p in professors if new_slot in constraints["professor_availability"].get(p, [])
-            ]
-            if possible_professors:
-                chromosome[course]["professor"] = random.choice(possible_professors)
-            else:
-                # If no professor is available, assign randomly (fitness will penalize)
-                chromosome[course]["professor"] = random.choice(professors)
+            chromosome[course].update(random_assignment(course))
 
     return chromosome
 
 
-def create_initial_population():
+def crossover_individual(parent1, parent2):
+    """
+    Uniform crossover on Individuals.
+    The offspring starts as a copy of parent1 and only the courses inherited
+    from parent2 with a different assignment are rescored.
+    """
+    offspring = parent1.copy()
+    for course in courses:
+        if random.random() >= 0.5:
+            assignment = parent2.chromosome[course]
+            if assignment != offspring.chromosome[course]:
+                reassign(offspring, course, assignment)
+    return offspring
+
+
+def mutate_individual(individual):
+    """
+    Mutate an Individual in place, rescoring only the mutated courses.
+    """
+    for course in courses:
+        if random.random() < mutation_rate:
+            reassign(individual, course, random_assignment(course))
+    return individual
+
+
+def create_initial_population(seeds=()):
     """
     Generate the initial population of chromosomes.
+    seeds are schedules from earlier runs, possibly of a slightly different
+    instance (see adapt_chromosome); they take the first places.
     """
-    return [create_chromosome() for _ in range(population_size)]
+    population = [adapt_chromosome(chromosome) for chromosome in list(seeds)[:population_size]]
+    population += [create_chromosome() for _ in range(population_size - len(population))]
+    return population
 
 
-def genetic_algorithm():
+def next_generation(population, elite_size=0):
     """
-    Execute the genetic algorithm to optimize the timetable.
+    Breed a new population of Individuals through selection, crossover, and mutation.
+    The elite_size fittest individuals are carried over unchanged (and unscored).
+    """
+    new_population = []
+    weights = roulette_weights([individual.fitness for individual in population])
+
+    if elite_size > 0:
+        elites = sorted(population, key=lambda individual: individual.fitness, reverse=True)[:elite_size]
+        new_population.extend(elites)
+        pairs = (population_size - len(elites) + 1) // 2
+    else:
+        pairs = population_size // 2
+
+    for _ in range(pairs):
+        parent1, parent2 = selection(population, weights)
+        offspring1 = crossover_individual(parent1, parent2)
+        offspring2 = crossover_individual(parent2, parent1)
+        offspring1 = mutate_individual(offspring1)
+        offspring2 = mutate_individual(offspring2)
+        new_population.extend([offspring1, offspring2])
+
+    if elite_size > 0:
+        del new_population[population_size:]
+    return new_population
+
+
+def _fingerprint():
+    # Identifies the instance and GA parameters a checkpoint was written for
+    instance = (courses, professors, rooms, time_slots, constraints, population_size, mutation_rate)
+    return hashlib.sha256(pickle.dumps(instance, protocol=4)).hexdigest()
+
+
+def save_checkpoint(path, state):
     """
-    population = create_initial_population()
-    best_chromosome = None
-    best_fitness = float('-inf')
+    Write a checkpoint atomically: pickled and zlib-compressed into a temporary
+    file next to `path`, which then replaces it, so a crash mid-write leaves
+    the previous checkpoint intact.
+    """
+    data = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+    descriptor, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load_checkpoint(path):
+    """
+    Read a checkpoint written by genetic_algorithm(checkpoint=...).
+    Checkpoints are pickles: only load ones you wrote yourself.
+    """
+    with open(path, "rb") as file:
+        return pickle.loads(zlib.decompress(file.read()))
 
-    for generation in range(generations):
-        new_population = []
 
-        # Generate offspring through selection, crossover, and mutation
-        for _ in range(population_size // 2):
-            parent1, parent2 = selection(population)
-            offspring1 = crossover(parent1, parent2)
-            offspring2 = crossover(parent2, parent1)
-            offspring1 = mutate(offspring1)
-            offspring2 = mutate(offspring2)
-            new_population.extend([offspring1, offspring2])
+def adapt_chromosome(chromosome):
+    """
+    Fit a chromosome from an earlier version of the instance to the current one:
+    assignments that still name a known room, time slot and professor are kept,
+    dropped courses are left out and new (or no longer valid) ones are drawn at random.
+    """
+    known_professors = set(professors)
+    known_slots = set(time_slots)
+    adapted = {}
+    for course in courses:
+        assignment = chromosome.get(course)
+        if (
+            assignment is None or assignment["room"] not in rooms
+            or assignment["time_slot"] not in known_slots or assignment["professor"] not in known_professors
+        ):
+            assignment = random_assignment(course)
+        adapted[course] = {key: assignment[key] for key in ("room", "time_slot", "professor")}
+    return adapted
 
-        # Replace the old population with the new one
-        population = new_population
 
-        # Evaluate and track the best chromosome
-        for chromosome in population:
-            fitness = calculate_fitness(chromosome)
-            if fitness > best_fitness:
-                best_fitness = fitness
-                best_chromosome = chromosome
+def genetic_algorithm(
+    elite_size=0, patience=None, target_fitness=None, time_limit=None, max_evaluations=None, on_generation=None,
+    checkpoint=None, checkpoint_every=10, resume=False, warm_start=None, seeds=(),
+):
+    """
+    Execute the genetic algorithm to optimize the timetable.
+    Fitness is cached on each Individual; offspring are scored incrementally.
+    on_generation, if given, is called after every generation with a dict of
+    generation, best (so far), mean and diversity (standard deviation) of the
+    population's fitness, evaluations and evaluations_per_second.
+
+    Stops after `generations` generations, or earlier when:
+    - the best fitness has not improved for `patience` generations,
+    - the best fitness reaches `target_fitness` (10 means no violations),
+    - `time_limit` seconds have elapsed (counted from this call, also when resuming),
+    - `max_evaluations` individuals have been scored.
+
+    Checkpoints:
+    - checkpoint is a file path; the population, best-so-far individual,
+      counters and `random` state are saved there every checkpoint_every
+      generations and when the run stops.
+    - resume=True continues from that file if it exists, exactly as the
+      interrupted run would have (barring time_limit); the instance and GA
+      parameters must be unchanged.
+    - warm_start is the path of a checkpoint from an earlier version of the
+      instance; its population (see adapt_chromosome) seeds a new run.
+    seeds are schedules to start the population from, e.g. a cached solution
+    (see create_initial_population).
+    """
+    start = time.perf_counter()
+    build_indexes()
+    fingerprint = None if checkpoint is None else _fingerprint()
+    if resume and checkpoint is not None and os.path.exists(checkpoint):
+        state = load_checkpoint(checkpoint)
+        if state["fingerprint"] != fingerprint:
+            raise ValueError(f"{checkpoint} was written for another instance or other parameters; use warm_start")
+        random.setstate(state["random_state"])
+        population = state["population"]
+        evaluations = state["evaluations"]
+        best_chromosome, best_fitness = state["best_chromosome"], state["best_fitness"]
+        stale_generations = state["stale_generations"]
+        first_generation = generations if state["done"] else state["generation"]
+    else:
+        seeds = list(seeds)
+        if warm_start is not None:
+            seeds += [individual.chromosome for individual in load_checkpoint(warm_start)["population"]]
+        population = [evaluate(chromosome) for chromosome in create_initial_population(seeds)]
+        evaluations = len(population)
+        best_chromosome = None
+        best_fitness = float('-inf')
+        stale_generations = 0
+        first_generation = 0
+
+    for generation in range(first_generation, generations):
+        # Replace the old population with the new one
+        generation_start = time.perf_counter()
+        population = next_generation(population, elite_size)
+        scored = len(population) - min(elite_size, len(population))
+        evaluations += scored
+
+        # Track the best chromosome
+        improved = False
+        for individual in population:
+            if individual.fitness > best_fitness:
+                best_fitness = individual.fitness
+                best_chromosome = individual.chromosome
+                improved = True
+        stale_generations = 0 if improved else stale_generations + 1
+
+        if on_generation is not None:
+            fitness_values = [individual.fitness for individual in population]
+            elapsed = time.perf_counter() - generation_start
+            on_generation({
+                "generation": generation + 1,
+                "best": best_fitness,
+                "mean": statistics.fmean(fitness_values),
+                "diversity": statistics.pstdev(fitness_values),
+                "evaluations": evaluations,
+                "evaluations_per_second": scored / elapsed if elapsed > 0 else 0.0,
+            })
 
         # Optional: Print progress every 10 generations
         if (generation + 1) % 10 == 0:
             print(f"Generation {generation + 1}: Best Fitness = {best_fitness}")
 
+        # Stopping rules
+        done = (
+            (target_fitness is not None and best_fitness >= target_fitness)
+            or (patience is not None and stale_generations >= patience)
+            or (time_limit is not None and time.perf_counter() - start >= time_limit)
+            or (max_evaluations is not None and evaluations >= max_evaluations)
+        )
+
+        if checkpoint is not None and (done or (generation + 1) % checkpoint_every == 0 or generation + 1 == generations):
+            save_checkpoint(checkpoint, {
+                "fingerprint": fingerprint,
+                "generation": generation + 1,
+                "done": done or generation + 1 == generations,
+                "population": population,
+                "evaluations": evaluations,
+                "best_chromosome": best_chromosome,
+                "best_fitness": best_fitness,
+                "stale_generations": stale_generations,
+                "random_state": random.getstate(),
+            })
+        if done:
+            break
+
     return best_chromosome, best_fitness
 
 
+def solve_problem(problem, **options):
+    """
+    Load a shared Problem and run genetic_algorithm(**options) on it.
+    Returns the best chromosome.
+    """
+    load_problem(problem)
+    best_chromosome, _ = genetic_algorithm(**options)
+    return best_chromosome
+
+
 if __name__ == "__main__":
     best_schedule, best_fitness = genetic_algorithm()
     print("\nOptimized Schedule:")
@@ -0,0 +1,182 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import genetic
+
+# Island model parameters
+migration_interval = 10  # Generations between migrations
+migrants = 2  # Individuals sent along each edge of the topology
+topology = "ring"  # "ring", "complete", or a dict {island: [destination islands]}
+replacement = "worst"  # "worst" or "random"
+
+
+def _problem_parameters():
+    return {
+        "courses": genetic.courses,
+        "professors": genetic.professors,
+        "rooms": genetic.rooms,
+        "time_slots": genetic.time_slots,
+        "constraints": genetic.constraints,
+        "population_size": genetic.population_size,
+        "mutation_rate": genetic.mutation_rate,
+    }
+
+
+def _init_worker(parameters):
+    """
+    Install the master's problem definition in a worker process.
+    """
+    for name, value in parameters.items():
+        setattr(genetic, name, value)
+    genetic.build_indexes()
+
+
+def _evolve_island(task):
+    """
+    Run one epoch of an island in a worker process.
+    The island's RNG state travels with it, so results do not depend on
+    which worker picks the task up.
+    """
+    population, rng_state, epoch_generations = task
+    random.setstate(rng_state)
+    if population is None:
+        population = [genetic.evaluate(chromosome) for chromosome in genetic.create_initial_population()]
+
+    best = None
+    for _ in range(epoch_generations):
+        population = genetic.next_generation(population)
+        for individual in population:
+            if best is None or individual.fitness > best.fitness:
+                best = individual
+
+    return population, best, random.getstate()
+
+
+def _destinations(island, n_islands, topology=None):
+    topology = globals()["topology"] if topology is None else topology
+    if isinstance(topology, dict):
+        destinations = topology.get(island, [])
+        for destination in destinations:
+            if not (isinstance(destination, int) and 0 <= destination < n_islands):
+                raise ValueError(
+                    f"Migration topology sends island {island} to {destination!r}, "
+                    f"but there are only {n_islands} islands (0..{n_islands - 1})"
+                )
+        return destinations
+    if topology == "ring":
+        return [(island + 1) % n_islands] if n_islands > 1 else []
+    if topology == "complete":
+        return [other for other in range(n_islands) if other != island]
+    raise ValueError(f"Unknown migration topology: {topology}")
+
+
+def migrate(populations, rng, migrants=None, topology=None, replacement=None):
+    """
+    Send copies of each island's best individuals along the topology.
+    Incoming migrants replace the worst (or randomly chosen) residents.
+    Parameters left as None use the module defaults.
+    """
+    migrants = globals()["migrants"] if migrants is None else migrants
+    replacement = globals()["replacement"] if replacement is None else replacement
+    n_islands = len(populations)
+    outgoing = [
+        sorted(population, key=lambda individual: individual.fitness, reverse=True)[:migrants]
+        for population in populations
+    ]
+
+    incoming = [[] for _ in range(n_islands)]
+    for island in range(n_islands):
+        for destination in _destinations(island, n_islands, topology):
+            incoming[destination].extend(individual.copy() for individual in outgoing[island])
+
+    for island, arrivals in enumerate(incoming):
+        population = populations[island]
+        arrivals = arrivals[:len(population)]
+        if replacement == "worst":
+            order = sorted(range(len(population)), key=lambda i: population[i].fitness)
+            slots = order[:len(arrivals)]
+        elif replacement == "random":
+            slots = rng.sample(range(len(population)), len(arrivals))
+        else:
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+        for slot, individual in zip(slots, arrivals):
+            population[slot] = individual
+
+
+def island_genetic_algorithm(
+    islands=None,
+    workers=None,
+    seed=0,
+    migration_interval=None,
+    migrants=None,
+    topology=None,
+    replacement=None,
+):
+    """
+    Execute the genetic algorithm as several islands evolving in parallel.
+    Islands exchange their best individuals every migration_interval generations.
+    Each island gets its own seed derived from seed, so runs are reproducible.
+    Migration parameters left as None use the module defaults.
+    """
+    migration_interval = globals()["migration_interval"] if migration_interval is None else migration_interval
+    topology = globals()["topology"] if topology is None else topology
+    workers = workers or os.cpu_count() or 1
+    islands = islands or workers
+    master_rng = random.Random(seed)
+
+    for island in range(islands):
+        _destinations(island, islands, topology)  # Reject a bad topology before any work
+
+    rng_states = [random.Random(seed * 1_000_003 + island).getstate() for island in range(islands)]
+    populations = [None] * islands
+
+    best_chromosome = None
+    best_fitness = float('-inf')
+    generation = 0
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, islands),
+        initializer=_init_worker,
+        initargs=(_problem_parameters(),),
+    ) as executor:
+        while generation < genetic.generations:
+            epoch = min(migration_interval, genetic.generations - generation)
+            tasks = [(populations[i], rng_states[i], epoch) for i in range(islands)]
+            results = list(executor.map(_evolve_island, tasks))
+            generation += epoch
+
+            populations = [population for population, _, _ in results]
+            rng_states = [state for _, _, state in results]
+            for _, best, _ in results:
+                if best is not None and best.fitness > best_fitness:
+                    best_fitness = best.fitness
+                    best_chromosome = best.chromosome
+
+            if generation < genetic.generations:
+                migrate(populations, master_rng, migrants, topology, replacement)
+
+            print(f"Generation {generation}: Best Fitness = {best_fitness}")
+
+    return best_chromosome, best_fitness
+
+
+def solve_problem(problem, **options):
+    """
+    Load a shared Problem into genetic.py and run island_genetic_algorithm(**options) on it.
+    Returns the best chromosome.
+    """
+    genetic.load_problem(problem)
+    best_chromosome, _ = island_genetic_algorithm(**options)
+    return best_chromosome
+
+
+if __name__ == "__main__":
+    best_schedule, best_fitness = island_genetic_algorithm()
+    print("\nOptimized Schedule:")
+    for course, assignment in best_schedule.items():
+        print(
+            f"{assignment['time_slot']}: {course} in {assignment['room']} "
+            f"with {assignment['professor']}"
+        )
+    print(f"Fitness: {best_fitness}")
@@ -0,0 +1,360 @@
+import time
+
+import numpy as np
+
+import genetic
+
+# Gene layout: population[individual, course] = (room, time_slot, professor)
+ROOM, SLOT, PROF = 0, 1, 2
+
+
+def build_tables(courses=None, professors=None, rooms=None, time_slots=None, constraints=None):
+    """
+    Intern the problem definition used by genetic.py into integer-indexed arrays.
+    Defaults to the problem currently defined in the genetic module.
+    """
+    courses = genetic.courses if courses is None else courses
+    professors = genetic.professors if professors is None else professors
+    rooms = genetic.rooms if rooms is None else rooms
+    time_slots = genetic.time_slots if time_slots is None else time_slots
+    constraints = genetic.constraints if constraints is None else constraints
+
+    room_names = list(rooms.keys())
+    course_index = {course: i for i, course in enumerate(courses)}
+    room_index = {room: j for j, room in enumerate(room_names)}
+    slot_index = {slot: t for t, slot in enumerate(time_slots)}
+
+    # Fixed rooms; a fixed course missing from the timetable is always penalized
+    fixed_room = np.full(len(courses), -1, dtype=np.int64)
+    missing_fixed = 0
+    for course, room in constraints["room_assignment"].items():
+        if course not in course_index:
+            missing_fixed += 1
+        elif room not in room_index:
+            raise ValueError(f"Course {course!r} is fixed to unknown room {room!r}")
+        else:
+            fixed_room[course_index[course]] = room_index[room]
+
+    # Fixed professors (optional); an unknown professor can never be matched
+    professor_index = {professor: p for p, professor in enumerate(professors)}
+    fixed_professor = np.full(len(courses), -1, dtype=np.int64)
+    for course, professor in constraints.get("professor_assignment", {}).items():
+        if course not in course_index:
+            missing_fixed += 1
+        else:
+            fixed_professor[course_index[course]] = professor_index.get(professor, len(professors))
+
+    # Professor availability as a (professor x slot) boolean matrix
+    available = np.zeros((len(professors), len(time_slots)), dtype=bool)
+    for p, professor in enumerate(professors):
+        for slot in constraints["professor_availability"].get(professor, []):
+            if slot in slot_index:
+                available[p, slot_index[slot]] = True
+
+    conflicts = np.array(
+        [
+            (course_index[a], course_index[b])
+            for a, b in constraints["course_conflicts"]
+            if a in course_index and b in course_index
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+    capacity_constraints = constraints.get("room_capacity_constraints")
+    students = np.array(
+        [(capacity_constraints or {}).get(course, 0) for course in courses], dtype=np.int64
+    )
+
+    return _tables(
+        courses,
+        professors,
+        room_names,
+        time_slots,
+        np.array([rooms[room] for room in room_names], dtype=np.int64),
+        fixed_room,
+        fixed_professor,
+        missing_fixed,
+        available,
+        conflicts,
+        students,
+        capacity_constraints is not None,
+    )
+
+
+def tables_from_problem(problem):
+    """
+    Build the tables straight from the arrays of a shared Problem (see problem.py).
+    """
+    return _tables(
+        problem.courses,
+        problem.professors,
+        problem.rooms,
+        problem.time_slots,
+        problem.capacity,
+        problem.fixed_room,
+        problem.fixed_professor,
+        0,
+        problem.available,
+        problem.conflict_pairs,
+        problem.students,
+        True,
+    )
+
+
+def _tables(courses, professors, rooms, time_slots, capacity, fixed_room, fixed_professor,
+            missing_fixed, available, conflicts, students, check_capacity):
+    # Padded (slot x professor) table of available professors, used for sampling,
+    # and the padded (professor x slot) table of each professor's slots
+    available_count = available.sum(axis=0)
+    available_list = np.zeros((len(time_slots), max(len(professors), 1)), dtype=np.int64)
+    for t in range(len(time_slots)):
+        profs = np.flatnonzero(available[:, t])
+        available_list[t, :len(profs)] = profs
+    slot_count = available.sum(axis=1)
+    slot_list = np.zeros((len(professors) + 1, max(len(time_slots), 1)), dtype=np.int64)
+    for p in range(len(professors)):
+        slots = np.flatnonzero(available[p])
+        slot_list[p, :len(slots)] = slots
+
+    return {
+        "courses": list(courses),
+        "professors": list(professors),
+        "rooms": list(rooms),
+        "time_slots": list(time_slots),
+        "capacity": np.asarray(capacity, dtype=np.int64),
+        "fixed_room": fixed_room,
+        "fixed_professor": fixed_professor,
+        "missing_fixed": missing_fixed,
+        "available": available,
+        "available_count": available_count,
+        "available_list": available_list,
+        "slot_count": np.append(slot_count, 0),  # Row len(professors): an unknown professor
+        "slot_list": slot_list,
+        "conflicts": np.asarray(conflicts, dtype=np.int64).reshape(-1, 2),
+        "students": np.asarray(students, dtype=np.int64),
+        "check_capacity": check_capacity,
+    }
+
+
+def encode_population(tables, population):
+    """
+    Convert a list of dict chromosomes into a (population x course x 3) array.
+    """
+    room_index = {room: j for j, room in enumerate(tables["rooms"])}
+    slot_index = {slot: t for t, slot in enumerate(tables["time_slots"])}
+    prof_index = {prof: p for p, prof in enumerate(tables["professors"])}
+    encoded = np.empty((len(population), len(tables["courses"]), 3), dtype=np.int64)
+    for n, chromosome in enumerate(population):
+        for i, course in enumerate(tables["courses"]):
+            assignment = chromosome[course]
+            encoded[n, i] = (
+                room_index[assignment["room"]],
+                slot_index[assignment["time_slot"]],
+                prof_index[assignment["professor"]],
+            )
+    return encoded
+
+
+def decode_chromosome(tables, genes):
+    """
+    Convert one (course x 3) row back into the dict chromosome used by genetic.py.
+    """
+    return {
+        course: {
+            "room": tables["rooms"][genes[i, ROOM]],
+            "time_slot": tables["time_slots"][genes[i, SLOT]],
+            "professor": tables["professors"][genes[i, PROF]],
+        }
+        for i, course in enumerate(tables["courses"])
+    }
+
+
+def _random_genes(tables, rng, shape):
+    """
+    Draw random (room, slot, professor) genes for an array of the given shape.
+    Mirrors create_chromosome: fixed rooms are kept, professors are drawn from
+    those available in the chosen slot, falling back to any professor, and a
+    fixed professor teaches in one of their own slots.
+    """
+    n_rooms = len(tables["rooms"])
+    n_slots = len(tables["time_slots"])
+    n_profs = len(tables["professors"])
+
+    fixed_room = tables["fixed_room"]
+    room = rng.integers(0, n_rooms, size=shape)
+    room = np.where(fixed_room >= 0, fixed_room, room)
+
+    slot = rng.integers(0, n_slots, size=shape)
+
+    count = tables["available_count"][slot]
+    pick = (rng.random(shape) * np.maximum(count, 1)).astype(np.int64)
+    prof = tables["available_list"][slot, pick]
+    prof = np.where(count > 0, prof, rng.integers(0, n_profs, size=shape))
+
+    fixed_professor = tables["fixed_professor"]
+    fixed = fixed_professor >= 0
+    if fixed.any():
+        required = np.broadcast_to(np.where(fixed, fixed_professor, len(tables["professors"])), shape)
+        own_count = tables["slot_count"][required]
+        pick = (rng.random(shape) * np.maximum(own_count, 1)).astype(np.int64)
+        slot = np.where(own_count > 0, tables["slot_list"][required, pick], slot)
+        prof = np.where(fixed & (fixed_professor < n_profs), fixed_professor, prof)
+
+    return np.stack([room, slot, prof], axis=-1)
+
+
+def create_initial_population(tables, rng, size=None):
+    """
+    Generate the initial population as a single integer array.
+    """
+    size = genetic.population_size if size is None else size
+    return _random_genes(tables, rng, (size, len(tables["courses"])))
+
+
+def calculate_fitness(tables, population):
+    """
+    Calculate the fitness of every chromosome in the population at once.
+    Applies the same penalties as genetic.calculate_fitness.
+    """
+    n_individuals, n_courses, _ = population.shape
+    room = population[..., ROOM]
+    slot = population[..., SLOT]
+    prof = population[..., PROF]
+    penalty = np.full(n_individuals, 5 * tables["missing_fixed"], dtype=np.int64)
+
+    # 1. Room Assignment Constraints
+    fixed = tables["fixed_room"] >= 0
+    if fixed.any():
+        penalty += 5 * (room[:, fixed] != tables["fixed_room"][fixed]).sum(axis=1)
+    fixed = tables["fixed_professor"] >= 0
+    if fixed.any():
+        penalty += 5 * (prof[:, fixed] != tables["fixed_professor"][fixed]).sum(axis=1)
+
+    # 2. Professor Availability Constraints
+    penalty += 5 * (~tables["available"][prof, slot]).sum(axis=1)
+
+    # 3. Course Conflicts
+    conflicts = tables["conflicts"]
+    if len(conflicts):
+        penalty += 5 * (slot[:, conflicts[:, 0]] == slot[:, conflicts[:, 1]]).sum(axis=1)
+
+    # 4. Professor Scheduling Conflicts: sum of (count - 1) over (professor, slot) keys
+    #    equals the number of equal neighbours once the keys are sorted.
+    if n_courses > 1:
+        keys = np.sort(prof * len(tables["time_slots"]) + slot, axis=1)
+        penalty += 5 * (keys[:, 1:] == keys[:, :-1]).sum(axis=1)
+
+    # 5. Room Capacity Constraints
+    if tables["check_capacity"]:
+        n_cells = len(tables["rooms"]) * len(tables["time_slots"])
+        cell = room * len(tables["time_slots"]) + slot
+        cell += (np.arange(n_individuals) * n_cells)[:, None]
+        load = np.bincount(
+            cell.ravel(),
+            weights=np.broadcast_to(tables["students"], cell.shape).ravel(),
+            minlength=n_individuals * n_cells,
+        ).reshape(n_individuals, len(tables["rooms"]), len(tables["time_slots"]))
+        over = load - tables["capacity"][None, :, None]
+        penalty += (5 * np.maximum(over, 0).sum(axis=(1, 2))).astype(np.int64)
+
+    return 10 - penalty
+
+
+def selection(rng, fitness, n_pairs):
+    """
+    Draw n_pairs of parent indices by fitness-weighted roulette selection.
+    """
+    adjusted = fitness.astype(np.float64)
+    min_fitness = adjusted.min()
+    if min_fitness <= 0:
+        adjusted += 1 - min_fitness
+    return rng.choice(len(fitness), size=(n_pairs, 2), p=adjusted / adjusted.sum())
+
+
+def crossover(rng, parents1, parents2):
+    """
+    Uniform crossover of two batches of parents; returns one batch of offspring.
+    """
+    mask = rng.random(parents1.shape[:2]) < 0.5
+    return np.where(mask[..., None], parents1, parents2)
+
+
+def mutate(tables, rng, population, rate=None):
+    """
+    Re-draw the whole (room, slot, professor) gene of each course with probability rate.
+    """
+    rate = genetic.mutation_rate if rate is None else rate
+    mask = rng.random(population.shape[:2]) < rate
+    return np.where(mask[..., None], _random_genes(tables, rng, population.shape[:2]), population)
+
+
+def genetic_algorithm(
+    tables=None, seed=None, generations=None, population_size=None, mutation_rate=None, on_generation=None
+):
+    """
+    Execute the genetic algorithm with the whole population held in one array.
+    on_generation is called after every generation with the same stats as in
+    genetic.genetic_algorithm.
+    Returns the best chromosome (as a dict) and its fitness.
+    """
+    tables = build_tables() if tables is None else tables
+    generations = genetic.generations if generations is None else generations
+    population_size = genetic.population_size if population_size is None else population_size
+    rng = np.random.default_rng(seed)
+
+    population = create_initial_population(tables, rng, population_size)
+    fitness = calculate_fitness(tables, population)
+    best = int(np.argmax(fitness))
+    best_genes = population[best].copy()
+    best_fitness = int(fitness[best])
+
+    for generation in range(generations):
+        generation_start = time.perf_counter()
+        pairs = selection(rng, fitness, population_size // 2)
+        parents1 = population[pairs[:, 0]]
+        parents2 = population[pairs[:, 1]]
+        offspring = np.concatenate(
+            [crossover(rng, parents1, parents2), crossover(rng, parents2, parents1)]
+        )
+        population = mutate(tables, rng, offspring, mutation_rate)
+        fitness = calculate_fitness(tables, population)
+
+        best = int(np.argmax(fitness))
+        if fitness[best] > best_fitness:
+            best_fitness = int(fitness[best])
+            best_genes = population[best].copy()
+
+        if on_generation is not None:
+            elapsed = time.perf_counter() - generation_start
+            on_generation({
+                "generation": generation + 1,
+                "best": best_fitness,
+                "mean": float(fitness.mean()),
+                "diversity": float(fitness.std()),
+                "evaluations": (generation + 2) * len(population),
+                "evaluations_per_second": len(population) / elapsed if elapsed > 0 else 0.0,
+            })
+
+        if (generation + 1) % 10 == 0:
+            print(f"Generation {generation + 1}: Best Fitness = {best_fitness}")
+
+    return decode_chromosome(tables, best_genes), best_fitness
+
+
+def solve_problem(problem, seed=None, **options):
+    """
+    Run genetic_algorithm on a shared Problem; returns the best chromosome.
+    """
+    best_chromosome, _ = genetic_algorithm(tables_from_problem(problem), seed, **options)
+    return best_chromosome
+
+
+if __name__ == "__main__":
+    best_schedule, best_fitness = genetic_algorithm(seed=0)
+    print("\nOptimized Schedule:")
+    for course, assignment in best_schedule.items():
+        print(
+            f"{assignment['time_slot']}: {course} in {assignment['room']} "
+            f"with {assignment['professor']}"
+        )
+    print(f"Fitness: {best_fitness}")
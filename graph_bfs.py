@@ -1,6 +1,8 @@
 #BFS
 from collections import deque
 
+from problem import to_graph
+
 # Input Data
 conflicts = {
     "CS102": ["Bio201"],
@@ -22,25 +24,30 @@ course_details = {
     "Math101": {"students": 40, "room": "R1"},  # Math101 must use R1
 }
 
-# BFS-based scheduling
-def bfs_schedule(conflicts, time_slots, rooms, professor_availability, course_details):
+# BFS-based scheduling; recorder is an optional instrumentation.Recorder
+def bfs_schedule(conflicts, time_slots, rooms, professor_availability, course_details, recorder=None):
     # Initialize course schedule
     course_schedule = {}
 
-    # Queue for BFS
+    # Queue for BFS; a course is queued at most once, even if it cannot be scheduled
     queue = deque()
+    visited = set()
 
     # Start with the first course
     for course in conflicts:
-        if course not in course_schedule:
+        if course not in visited:
+            visited.add(course)
             queue.append(course)
 
             while queue:
+                if recorder is not None:
+                    recorder.gauge("bfs.queue_depth", len(queue))
                 current_course = queue.popleft()
 
                 # Get course details
                 num_students = course_details[current_course]["students"]
                 required_room = course_details[current_course].get("room")  # Fixed room?
+                required_professor = course_details[current_course].get("professor")  # Fixed professor?
 
                 # Find unavailable slots (used by neighbors which is in conflicts)
                 unavailable_slots = set(
@@ -57,7 +64,9 @@ def bfs_schedule(conflicts, time_slots, rooms, professor_availability, course_de
                             if capacity >= num_students and (not required_room or room == required_room):
                                 # Assign a professor
                                 for professor, available_slots in professor_availability.items():
-                                    if slot in available_slots:
+                                    if slot in available_slots and (
+                                        not required_professor or professor == required_professor
+                                    ):
                                         # Schedule the course
                                         course_schedule[current_course] = {
                                             "time_slot": slot,
@@ -72,16 +81,25 @@ def bfs_schedule(conflicts, time_slots, rooms, professor_availability, course_de
 
                 # Add neighbors to the queue
                 for neighbor in conflicts[current_course]:
-                    if neighbor not in course_schedule:
+                    if neighbor not in visited:
+                        visited.add(neighbor)
                         queue.append(neighbor)
 
     return course_schedule
 
 
-# Schedule courses
-schedule = bfs_schedule(conflicts, time_slots, rooms, professor_availability, course_details)
+def solve_problem(problem, recorder=None):
+    """
+    Run bfs_schedule on a shared Problem (see problem.py).
+    """
+    return bfs_schedule(*to_graph(problem), recorder=recorder)
+
+
+if __name__ == "__main__":
+    # Schedule courses
+    schedule = bfs_schedule(conflicts, time_slots, rooms, professor_availability, course_details)
 
-# Output the schedule
-print("Course Schedule:")
-for course, details in schedule.items():
-    print(f"{course}: Time Slot: {details['time_slot']}, Room: {details['room']}, Professor: {details['professor']}")
+    # Output the schedule
+    print("Course Schedule:")
+    for course, details in schedule.items():
+        print(f"{course}: Time Slot: {details['time_slot']}, Room: {details['room']}, Professor: {details['professor']}")
@@ -1,5 +1,8 @@
 #DFS
-from collections import deque
+from array import array
+from bisect import bisect_left
+
+from problem import to_graph
 
 # Input Data
 conflicts1 = {
@@ -22,64 +25,161 @@ course_details1 = {
     "Math101": {"students": 40, "room": "R1"},  # Math101 must use R1
 }
 
-def dfs_schedule(conflicts, time_slots, rooms, professor_availability, course_details):
+def build_adjacency(conflicts):
+    """
+    Build a symmetric conflict adjacency in CSR form with two passes over the
+    input: the neighbours of course i are indices[indptr[i]:indptr[i + 1]].
+    Returns (courses, indptr, indices).
+    """
+    courses = []
+    index = {}
+    for course, others in conflicts.items():
+        for name in (course, *others):
+            if name not in index:
+                index[name] = len(courses)
+                courses.append(name)
+
+    # Pass 1: degrees
+    indptr = array("l", [0]) * (len(courses) + 1)
+    for course, others in conflicts.items():
+        i = index[course]
+        for other in others:
+            j = index[other]
+            if i != j:
+                indptr[i + 1] += 1
+                indptr[j + 1] += 1
+    for i in range(len(courses)):
+        indptr[i + 1] += indptr[i]
+
+    # Pass 2: fill
+    indices = array("l", [0]) * indptr[-1]
+    cursor = array("l", indptr)
+    for course, others in conflicts.items():
+        i = index[course]
+        for other in others:
+            j = index[other]
+            if i != j:
+                indices[cursor[i]] = j
+                cursor[i] += 1
+                indices[cursor[j]] = i
+                cursor[j] += 1
+
+    return courses, indptr, indices
+
+
+def dfs_schedule(conflicts, time_slots, rooms, professor_availability, course_details, recorder=None):
+    """
+    Schedule courses in depth-first order over the conflict graph.
+    Uses an explicit stack, so long conflict chains cannot hit the recursion
+    limit, and only its arguments. Free rooms (kept sorted by capacity,
+    smallest fitting first) and free professors are tracked per slot, so
+    neither is double-booked and a full slot is skipped at once.
+    recorder is an optional instrumentation.Recorder.
+    """
+    courses, indptr, indices = build_adjacency(conflicts)
+    n_slots = len(time_slots)
+    slot_of = array("l", [-1]) * len(courses)
+
+    # Occupancy per slot: free (capacity, room) pairs and free professors (next one last)
+    rooms_by_capacity = sorted((capacity, room) for room, capacity in rooms.items())
+    free_rooms = [list(rooms_by_capacity) for _ in time_slots]
+    free_professors = [
+        [
+            professor for professor, available_slots in reversed(professor_availability.items())
+            if slot in available_slots
+        ]
+        for slot in time_slots
+    ]
+
     # Initialize course schedule
-    course_schedule1 = {}
+    course_schedule = {}
+
+    def assign(i):
+        course = courses[i]
+        num_students = course_details[course]["students"]
+        required_room = course_details[course].get("room")  # Fixed room?
+        required_professor = course_details[course].get("professor")  # Fixed professor?
 
-    def dfs(course):
         # Find unavailable slots (used by neighbors)
-        unavailable_slots = set(
-            course_schedule1[neighbor]["time_slot"]
-            for neighbor in conflicts1[course]
-            if neighbor in course_schedule1
-        )
+        unavailable_slots = {slot_of[j] for j in indices[indptr[i]:indptr[i + 1]]}
 
         # Assign time slot, room, and professor
-        for slot in time_slots1:
-            if slot in unavailable_slots:
-                continue  # Skip unavailable slots
-
-            # Check room availability
-            for room, capacity in rooms1.items():
-                if course_details[course]["students"] > capacity:
-                    continue  # Room too small
-
-                # Check professor availability
-                for professor, available_slots in professor_availability.items():
-                    if slot not in available_slots:
-                        continue  # Professor unavailable
-
-                    # If all constraints are satisfied, assign the course
-                    course_schedule1[course] = {
-                        "time_slot": slot,
-                        "room": room,
-                        "professor": professor,
-                    }
-                    break
-                else:
-                    # No professor found; try another room
-                    continue
-                break
+        for t in range(n_slots):
+            if t in unavailable_slots or not free_professors[t] or not free_rooms[t]:
+                continue  # Conflict, or nothing left in this slot
+            if required_professor and required_professor not in free_professors[t]:
+                continue  # Required professor busy or unavailable
+            slot_rooms = free_rooms[t]
+            if required_room:
+                key = (rooms.get(required_room, -1), required_room)
+                position = bisect_left(slot_rooms, key)
+                if position == len(slot_rooms) or slot_rooms[position] != key or key[0] < num_students:
+                    continue  # Required room taken, missing or too small
+            else:
+                position = bisect_left(slot_rooms, (num_students,))
+                if position == len(slot_rooms):
+                    continue  # No free room large enough
+
+            # If all constraints are satisfied, assign the course
+            _, room = slot_rooms.pop(position)
+            if required_professor:
+                free_professors[t].remove(required_professor)
+                professor = required_professor
             else:
-                # No room found; try another slot
+                professor = free_professors[t].pop()
+            slot_of[i] = t
+            course_schedule[course] = {
+                "time_slot": time_slots[t],
+                "room": room,
+                "professor": professor,
+            }
+            return
+
+    # Explicit-stack DFS from each unvisited course
+    visited = bytearray(len(courses))
+    node_stack = array("l")
+    position_stack = array("l")
+    for root in range(len(courses)):
+        if visited[root]:
+            continue
+        visited[root] = 1
+        assign(root)
+        node_stack.append(root)
+        position_stack.append(indptr[root])
+
+        while node_stack:
+            if recorder is not None:
+                recorder.gauge("dfs.stack_depth", len(node_stack))
+            node = node_stack[-1]
+            position = position_stack[-1]
+            if position == indptr[node + 1]:
+                node_stack.pop()
+                position_stack.pop()
                 continue
-            break
+            position_stack[-1] = position + 1
+
+            # Visit neighbors
+            neighbor = indices[position]
+            if not visited[neighbor]:
+                visited[neighbor] = 1
+                assign(neighbor)
+                node_stack.append(neighbor)
+                position_stack.append(indptr[neighbor])
+
+    return course_schedule
 
-        # Visit neighbors
-        for neighbor in conflicts1[course]:
-            if neighbor not in course_schedule1:
-                dfs(neighbor)
 
-    # Start DFS for each course
-    for course in conflicts1:
-        if course not in course_schedule1:
-            dfs(course)
+def solve_problem(problem, recorder=None):
+    """
+    Run dfs_schedule on a shared Problem (see problem.py).
+    """
+    return dfs_schedule(*to_graph(problem), recorder=recorder)
 
-    return course_schedule1
-schedule1 = dfs_schedule(conflicts1, time_slots1, rooms1, professor_availability1, course_details1)
 
+if __name__ == "__main__":
+    schedule1 = dfs_schedule(conflicts1, time_slots1, rooms1, professor_availability1, course_details1)
 
-# Output the schedule
-print("Course Schedule:")
-for course, details in schedule1.items():
-    print(f"{course}: Time Slot: {details['time_slot']}, Room: {details['room']}, Professor: {details['professor']}")
\ No newline at end of file
+    # Output the schedule
+    print("Course Schedule:")
+    for course, details in schedule1.items():
+        print(f"{course}: Time Slot: {details['time_slot']}, Room: {details['room']}, Professor: {details['professor']}")
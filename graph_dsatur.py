@@ -0,0 +1,143 @@
+#DSatur
+import heapq
+from bisect import bisect_left
+
+from problem import to_graph
+
+# Input Data
+conflicts = {
+    "CS102": ["Bio201"],
+    "Bio201": ["CS102"],
+    "Math101": [],  # Math101 has no conflicts
+}
+
+time_slots = ["9:00-10:00", "10:00-11:00", "11:00-12:00"]
+rooms = {"R1": 50, "R2": 100}  # Room capacities
+professor_availability = {
+    "P1": ["10:00-11:00", "11:00-12:00"],  # P1 is only available during these times
+    "P2": time_slots,  # P2 is available all day
+    "P3": time_slots,  # P3 is available all day
+}
+
+course_details = {
+    "CS102": {"students": 30},
+    "Bio201": {"students": 80},
+    "Math101": {"students": 40, "room": "R1"},  # Math101 must use R1
+}
+
+
+# DSatur-based scheduling
+def dsatur_schedule(conflicts, time_slots, rooms, professor_availability, course_details):
+    """
+    Colour the conflict graph with time slots in DSatur order: the course whose
+    scheduled neighbours already occupy the most distinct slots goes next, with
+    degree as the tiebreak. The heap is updated lazily: a course is pushed
+    again whenever its saturation grows and stale entries are skipped on pop.
+    Free rooms (kept sorted by capacity, smallest fitting first) and free
+    professors are tracked per slot so neither is double-booked.
+    """
+    # Symmetric adjacency, built once
+    neighbours = {}
+    for course, others in conflicts.items():
+        neighbours.setdefault(course, set())
+        for other in others:
+            if other != course:
+                neighbours[course].add(other)
+                neighbours.setdefault(other, set()).add(course)
+
+    # Occupancy per slot: free (capacity, room) pairs and free professors (next one last)
+    rooms_by_capacity = sorted((capacity, room) for room, capacity in rooms.items())
+    free_rooms = {slot: list(rooms_by_capacity) for slot in time_slots}
+    free_professors = {
+        slot: [
+            professor for professor, available_slots in reversed(professor_availability.items())
+            if slot in available_slots
+        ]
+        for slot in time_slots
+    }
+
+    course_schedule = {}
+    unschedulable = set()
+    neighbour_slots = {course: set() for course in neighbours}  # Saturation = len(neighbour_slots[course])
+
+    # Heap entries are single ints ordering by (saturation desc, degree desc, input order)
+    courses = list(neighbours)
+    order = {course: i for i, course in enumerate(courses)}
+    degree_bound = max((len(others) for others in neighbours.values()), default=0) + 1
+
+    def priority(course):
+        rank = -len(neighbour_slots[course]) * degree_bound - len(neighbours[course])
+        return rank * len(courses) + order[course]
+
+    heap = [priority(course) for course in courses]
+    heapq.heapify(heap)
+
+    while heap:
+        entry = heapq.heappop(heap)
+        course = courses[entry % len(courses)]
+        if course in course_schedule or course in unschedulable:
+            continue
+        if entry != priority(course):
+            continue  # Stale entry
+
+        num_students = course_details[course]["students"]
+        required_room = course_details[course].get("room")  # Fixed room?
+        required_professor = course_details[course].get("professor")  # Fixed professor?
+
+        for slot in time_slots:
+            if slot in neighbour_slots[course] or not free_professors[slot]:
+                continue
+            if required_professor and required_professor not in free_professors[slot]:
+                continue
+            slot_rooms = free_rooms[slot]
+            if required_room:
+                key = (rooms.get(required_room, -1), required_room)
+                position = bisect_left(slot_rooms, key)
+                if position == len(slot_rooms) or slot_rooms[position] != key or key[0] < num_students:
+                    continue
+            else:
+                position = bisect_left(slot_rooms, (num_students,))
+                if position == len(slot_rooms):
+                    continue
+
+            # Schedule the course
+            _, room = slot_rooms.pop(position)
+            if required_professor:
+                free_professors[slot].remove(required_professor)
+                professor = required_professor
+            else:
+                professor = free_professors[slot].pop()
+            course_schedule[course] = {
+                "time_slot": slot,
+                "room": room,
+                "professor": professor,
+            }
+            break
+        else:
+            unschedulable.add(course)
+            continue
+
+        # Raise the saturation of unscheduled neighbours
+        for neighbour in neighbours[course]:
+            if neighbour not in course_schedule and slot not in neighbour_slots[neighbour]:
+                neighbour_slots[neighbour].add(slot)
+                heapq.heappush(heap, priority(neighbour))
+
+    return course_schedule
+
+
+def solve_problem(problem):
+    """
+    Run dsatur_schedule on a shared Problem (see problem.py).
+    """
+    return dsatur_schedule(*to_graph(problem))
+
+
+if __name__ == "__main__":
+    # Schedule courses
+    schedule = dsatur_schedule(conflicts, time_slots, rooms, professor_availability, course_details)
+
+    # Output the schedule
+    print("Course Schedule:")
+    for course, details in schedule.items():
+        print(f"{course}: Time Slot: {details['time_slot']}, Room: {details['room']}, Professor: {details['professor']}")
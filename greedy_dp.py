@@ -1,57 +1,336 @@
+from collections import deque
+
+import numpy as np
+
+from instrumentation import span
+from problem import to_greedy
+
 courses = [("Math101", 30), ("CS102", 60), ("Bio201", 50)]  # (course, students)
 rooms = [("R1", 50), ("R2", 100)]  # (room, capacity)
 time_slots = [1, 2, 3]  # Time slots: 9:00-10:00, 10:00-11:00, 11:00-12:00
 prof_availability = {"Math101": [2, 3], "CS102": [1, 2], "Bio201": [1, 3]}  # Professors' availability
 conflicts = [("CS102", "Bio201")]  # Courses that cannot overlap
 
-rooms.sort(key=lambda x: x[1])  # Sort rooms by capacity (small to large)
-
-# DP Table: Initialize
-n = len(courses)
-m = len(rooms)
-k = len(time_slots)
-dp = [[[False for _ in range(k)] for _ in range(m)] for _ in range(n)]
-
-# Build the DP table
-for i in range(n):  # Iterate over courses
-    course, students = courses[i]
-    for j in range(m):  # Iterate over rooms
-        room, capacity = rooms[j]
-        if students <= capacity:  # Room must be large enough
-            for t in range(k):  # Iterate over time slots
-                # Check professor availability
-                if t + 1 in prof_availability[course]:
-                    # Check for course conflicts
-                    conflict_free = True
-                    for conflict_course in conflicts:
-                        if course in conflict_course:
-                            other_course = conflict_course[0] if course == conflict_course[1] else conflict_course[1]
-                            # Find index of the conflicting course
-                            conflict_index = next((idx for idx, c in enumerate(courses) if c[0] == other_course), -1)
-                            # Check if conflicting course is scheduled at the same time
-                            if conflict_index != -1:
-                                conflict_free = all(
-                                    not dp[conflict_index][room_idx][t]
-                                    for room_idx in range(m)
-                                )
-                    if conflict_free:
-                        dp[i][j][t] = True  # Course can be scheduled in this room and time slot
-
-# Assign courses greedily using the DP table
-schedule = []  # Final schedule
-used_slots = set()  # To track used room-time combinations
-
-for i in range(n):  # Iterate over courses
-    for j in range(m):  # Iterate over rooms
-        for t in range(k):  # Iterate over time slots
-            if dp[i][j][t] and (j, t) not in used_slots:
-                course, _ = courses[i]
-                room, _ = rooms[j]
-                schedule.append((course, room, t + 1))  # Add course, room, and time slot to schedule
-                used_slots.add((j, t))  # Mark the room and time slot as used
+
+def build_feasibility_table(
+    courses, rooms, time_slots, prof_availability, conflicts, block_conflicts=True, fixed_rooms=None
+):
+    """
+    Build the DP table as a (course x room x slot) boolean array.
+    dp[i, j, t] is True when course i fits room j (its fixed room, if
+    fixed_rooms names one), its professor is available in slot t, and
+    (if block_conflicts) no earlier conflicting course can use slot t in any room.
+    Returns the table and the rooms sorted by capacity (small to large), which
+    is the room order of the table's second axis.
+    """
+    rooms = sorted(rooms, key=lambda x: x[1])  # Sort rooms by capacity (small to large)
+    n = len(courses)
+    k = len(time_slots)
+
+    # Name -> index maps, built once
+    course_index = {course: i for i, (course, _) in enumerate(courses)}
+    slot_index = {slot: t for t, slot in enumerate(time_slots)}
+
+    # Room must be large enough: (course x room) mask by broadcasting
+    students = np.array([students for _, students in courses], dtype=np.int64).reshape(n)
+    capacity = np.array([capacity for _, capacity in rooms], dtype=np.int64).reshape(len(rooms))
+    fits = students[:, None] <= capacity[None, :]
+    if fixed_rooms:
+        room_names = [room for room, _ in rooms]
+        for course, room in fixed_rooms.items():
+            if course in course_index:
+                fits[course_index[course]] &= [name == room for name in room_names]
+
+    # Professor availability: (course x slot) matrix
+    available = np.zeros((n, k), dtype=bool)
+    for course, slots in prof_availability.items():
+        if course in course_index:
+            for slot in slots:
+                if slot in slot_index:
+                    available[course_index[course], slot_index[slot]] = True
+
+    dp = fits[:, :, None] & available[:, None, :]
+
+    if not block_conflicts:
+        return dp, rooms
+
+    # Course conflicts: only courses earlier in the order constrain a course
+    earlier = {}
+    for course1, course2 in conflicts:
+        if course1 in course_index and course2 in course_index:
+            i1, i2 = course_index[course1], course_index[course2]
+            if i1 != i2:
+                earlier.setdefault(max(i1, i2), []).append(min(i1, i2))
+
+    usable_slots = dp.any(axis=1)  # (course x slot): usable in some room
+    for i in sorted(earlier):
+        blocked = usable_slots[earlier[i]].any(axis=0)
+        dp[i, :, blocked] = False
+        usable_slots[i] = dp[i].any(axis=0)
+
+    return dp, rooms
+
+
+def greedy_assign(dp, courses, rooms, time_slots):
+    """
+    Assign courses greedily using the DP table.
+    Each course takes the first free (room, slot) cell in room-major order.
+    """
+    schedule = []  # Final schedule
+    free = np.ones(dp.shape[1:], dtype=bool)  # To track unused room-time combinations
+
+    for i in range(len(courses)):  # Iterate over courses
+        candidates = np.flatnonzero(dp[i] & free)
+        if len(candidates):
+            j, t = divmod(int(candidates[0]), dp.shape[2])
+            course, _ = courses[i]
+            room, _ = rooms[j]
+            schedule.append((course, room, time_slots[t]))  # Add course, room, and time slot to schedule
+            free[j, t] = False  # Mark the room and time slot as used
+
+    return schedule
+
+
+class MinCostAssignment:
+    """
+    Min-cost assignment of courses to (room, slot) cells, solved with the
+    Hungarian method (successive shortest paths with dual potentials), one
+    course at a time. The cost of a course in a cell is its wasted seats.
+    Every course also has a private "unassigned" column priced above any total
+    waste, so the result first maximizes the number of courses placed and then
+    minimizes wasted seats.
+    The problem is kept square: every column not used by a course holds an
+    implicit zero-cost placeholder, so a released cell stays free until the
+    next augment fills it and the matching remains optimal after repairs.
+    Only the (course x cell) costs are stored; the inner loop runs over NumPy
+    arrays of columns.
+    """
+
+    FREE, EMPTY = -2, -1  # Column owners other than a course
+
+    def __init__(self, dp, waste):
+        n, m, k = dp.shape
+        self.n, self.k, self.n_cells = n, k, m * k
+        self.unassigned = int(max(waste.max(initial=0), 0) + 1) * (n + 1)  # Exceeds any total waste
+        self.infeasible = self.unassigned * (n + 1)
+
+        self.cost = np.repeat(waste.astype(np.int64), k, axis=1)  # cell = room * k + slot
+        self.cost[~dp.reshape(n, m * k)] = self.infeasible
+
+        # Columns: the cells, then one "unassigned" column per course (n_cells + i).
+        # Cells start out holding placeholders; "unassigned" columns start out free.
+        columns = self.n_cells + n
+        self.u = np.zeros(n, dtype=np.int64)
+        self.v = np.zeros(columns, dtype=np.int64)
+        self.owner = np.full(columns, self.FREE, dtype=np.int64)  # column -> course, EMPTY or FREE
+        self.owner[:self.n_cells] = self.EMPTY
+        self.column = np.full(n, -1, dtype=np.int64)  # course -> column
+
+    def cell_of(self, i):
+        """
+        The (room, slot) cell index of course i, or -1 if it is unassigned.
+        """
+        column = self.column[i]
+        return int(column) if 0 <= column < self.n_cells else -1
+
+    def forbid(self, i, slot):
+        """
+        Exclude every room in `slot` for course i (conflict repair).
+        """
+        self.cost[i, slot:self.n_cells:self.k] = self.infeasible
+
+    def release(self, i):
+        """
+        Take course i out of the matching so it can be augmented again.
+        Its column is left free, so the next augment ends there.
+        """
+        column = self.column[i]
+        if column != -1:
+            self.owner[column] = self.FREE
+            self.column[i] = -1
+
+    def augment(self, source):
+        """
+        Assign course `source` along a shortest augmenting path to a free column.
+        A placeholder (cost 0 everywhere, potential -v of its column) can move
+        to any column, so all placeholders are relaxed together through the
+        cheapest one reached.
+        Returns the courses whose column changed.
+        """
+        n_cells = self.n_cells
+        sentinel = self.infeasible * 4
+        dist = np.full(len(self.v), sentinel, dtype=np.int64)
+        way = np.full(len(self.v), -1, dtype=np.int64)
+        placeholder_best = sentinel
+
+        # Search order: 2 * dist, plus 1 unless the column is free (ties end the search).
+        # Placeholders reached through another placeholder cannot improve anything,
+        # so they wait at `hidden` like unreached columns; used columns are at `done`.
+        hidden, done = 2 * sentinel, 2 * sentinel + 1
+        not_free = (self.owner != self.FREE).astype(np.int64)
+        order = np.full(len(self.v), hidden, dtype=np.int64)
+
+        self.u[source] = 0
+        row, column, reached = source, -1, 0
+        while True:
+            if row >= 0:
+                candidate = self.cost[row] - self.u[row] - self.v[:n_cells] + reached
+                better = ((candidate < dist[:n_cells]) & (order[:n_cells] != done)).nonzero()[0]
+                dist[better] = candidate[better]
+                way[better] = column
+                order[better] = 2 * candidate[better] + not_free[better]
+                own = n_cells + row
+                candidate = self.unassigned - self.u[row] - self.v[own] + reached
+                if order[own] != done and candidate < dist[own]:
+                    dist[own], way[own] = candidate, column
+                    order[own] = 2 * candidate + not_free[own]
+            elif reached + self.v[column] < placeholder_best:
+                placeholder_best = reached + self.v[column]
+                candidate = placeholder_best - self.v
+                better = ((candidate < dist) & (order != done)).nonzero()[0]
+                dist[better] = candidate[better]
+                way[better] = column
+                order[better] = np.where(
+                    self.owner[better] == self.EMPTY, hidden, 2 * candidate[better] + not_free[better]
+                )
+
+            column = int(order.argmin())
+            reached = dist[column]
+            order[column] = done
+            if self.owner[column] == self.FREE:
                 break
+            row = int(self.owner[column])
+
+        # Potentials: every column closer than the free one moves by the distance still
+        # to go, and so does its owner (a placeholder's potential follows its column)
+        closer = np.flatnonzero(dist < reached)
+        delta = reached - dist[closer]
+        self.v[closer] -= delta
+        owners = self.owner[closer]
+        self.u[owners[owners >= 0]] += delta[owners >= 0]
+        self.u[source] += reached
+
+        moved = []
+        while column != -1:
+            previous = int(way[column])
+            row = source if previous == -1 else int(self.owner[previous])
+            self.owner[column] = row
+            if row >= 0:
+                self.column[row] = column
+                moved.append(row)
+            column = previous
+        return moved
+
+
+def matching_assign(courses, rooms, time_slots, prof_availability, conflicts, fixed_rooms=None, recorder=None):
+    """
+    Assign courses to (room, slot) cells by min-cost matching, minimizing wasted seats.
+    Conflicting courses that end up in the same slot are repaired iteratively:
+    the course that just moved there is evicted, barred from that slot and re-matched.
+    The returned matching is optimal for the slots barred by the end.
+    recorder, an optional instrumentation.Recorder, gets a span for each phase.
+    Returns a list of (course, room, time_slot) tuples.
+    """
+    with span(recorder, "greedy_dp.table", courses=len(courses)):
+        dp, sorted_rooms = build_feasibility_table(
+            courses, rooms, time_slots, prof_availability, conflicts, block_conflicts=False, fixed_rooms=fixed_rooms
+        )
+    students = np.array([students for _, students in courses], dtype=np.int64).reshape(len(courses))
+    capacity = np.array([capacity for _, capacity in sorted_rooms], dtype=np.int64).reshape(len(sorted_rooms))
+    with span(recorder, "greedy_dp.assign", courses=len(courses)):
+        matching = MinCostAssignment(dp, capacity[None, :] - students[:, None])
+
+        course_index = {course: i for i, (course, _) in enumerate(courses)}
+        partners = [[] for _ in courses]
+        for course1, course2 in conflicts:
+            if course1 in course_index and course2 in course_index and course1 != course2:
+                partners[course_index[course1]].append(course_index[course2])
+                partners[course_index[course2]].append(course_index[course1])
+
+        def slot_of(i):
+            cell = matching.cell_of(i)
+            return -1 if cell == -1 else cell % matching.k
+
+        queue = deque(range(len(courses)))
+        while queue:
+            for course in matching.augment(queue.popleft()):
+                slot = slot_of(course)
+                if slot != -1 and any(slot_of(other) == slot for other in partners[course]):
+                    matching.release(course)
+                    matching.forbid(course, slot)
+                    queue.append(course)
+
+        schedule = []
+        for i, (course, _) in enumerate(courses):
+            cell = matching.cell_of(i)
+            if cell != -1:
+                j, t = divmod(cell, matching.k)
+                schedule.append((course, sorted_rooms[j][0], time_slots[t]))
+        return schedule
+
+
+def greedy_dp_schedule(
+    courses, rooms, time_slots, prof_availability, conflicts, method="greedy", fixed_rooms=None, recorder=None
+):
+    """
+    Build the DP table and assign courses.
+    method="greedy" takes the first free cell per course; method="matching"
+    uses min-cost matching with conflict repair. fixed_rooms optionally maps
+    courses to the only room they may use. recorder, an optional
+    instrumentation.Recorder, gets a span for each phase.
+    Returns a list of (course, room, time_slot) tuples.
+    """
+    if method == "matching":
+        return matching_assign(courses, rooms, time_slots, prof_availability, conflicts, fixed_rooms, recorder)
+    if method != "greedy":
+        raise ValueError(f"Unknown method: {method}")
+    with span(recorder, "greedy_dp.table", courses=len(courses)):
+        dp, sorted_rooms = build_feasibility_table(
+            courses, rooms, time_slots, prof_availability, conflicts, fixed_rooms=fixed_rooms
+        )
+    with span(recorder, "greedy_dp.assign", courses=len(courses)):
+        return greedy_assign(dp, courses, sorted_rooms, time_slots)
+
+
+def solve_problem(problem, method="greedy", recorder=None):
+    """
+    Run greedy_dp_schedule on a shared Problem (see problem.py) and pick the professors
+    afterwards: a course's fixed professor, else any professor still free in its slot.
+    A course left without a professor is dropped.
+    Returns {course: {"room", "time_slot", "professor"}}.
+    """
+    fixed_rooms = {
+        course: problem.rooms[r] for course, r in zip(problem.courses, problem.fixed_room.tolist()) if r >= 0
+    }
+    placed = greedy_dp_schedule(*to_greedy(problem), method=method, fixed_rooms=fixed_rooms, recorder=recorder)
+    slot_index = {slot: t for t, slot in enumerate(problem.time_slots)}
+    busy = set()  # (professor, slot) pairs in use
+
+    # Fixed professors first, so no other course takes them
+    schedule = {}
+    open_courses = []
+    for course, room, time_slot in placed:
+        t = slot_index[time_slot]
+        p = int(problem.fixed_professor[problem.course_index[course]])
+        if p < 0:
+            open_courses.append((course, room, t))
+        else:
+            busy.add((p, t))
+            schedule[course] = {"room": room, "time_slot": time_slot, "professor": problem.professors[p]}
+
+    for course, room, t in open_courses:
+        for p in problem.professors_in(t).tolist():
+            if (p, t) not in busy:
+                busy.add((p, t))
+                schedule[course] = {"room": room, "time_slot": problem.time_slots[t], "professor": problem.professors[p]}
+                break
+    return schedule
+
+
+if __name__ == "__main__":
+    schedule = greedy_dp_schedule(courses, rooms, time_slots, prof_availability, conflicts)
 
-# Output the schedule
-print("Final Schedule:")
-for course, room, time_slot in schedule:
-    print(f"Course: {course}, Room: {room}, Time Slot: {time_slot}")
+    # Output the schedule
+    print("Final Schedule:")
+    for course, room, time_slot in schedule:
+        print(f"Course: {course}, Room: {room}, Time Slot: {time_slot}")
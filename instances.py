@@ -0,0 +1,262 @@
+import csv
+import json
+import math
+import os
+from array import array
+from collections import defaultdict
+from itertools import count, islice
+from operator import itemgetter
+
+import numpy as np
+
+from problem import Problem, ProblemBuilder
+
+
+def _rows(path, required, optional=()):
+    """
+    Stream records from a CSV file (with a header row) or a JSON-lines file
+    (.jsonl), one tuple of the required then optional columns per record.
+    Missing or empty optional values come back as None.
+    """
+    columns = tuple(required) + tuple(optional)
+    with open(path, newline="") as file:
+        if path.endswith(".jsonl"):
+            for line_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                for column in required:
+                    if record.get(column) in (None, ""):
+                        raise ValueError(f"{path}:{line_number}: missing {column!r}")
+                yield tuple(None if record.get(column) == "" else record.get(column) for column in columns)
+        else:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            for column in required:
+                if column not in header:
+                    raise ValueError(f"{path}: no {column!r} column")
+            positions = [header.index(column) if column in header else len(header) for column in columns]
+            pick = itemgetter(*positions)
+            width = len(header) + 1
+            if not optional:
+                # Fast path: required values are never empty
+                for row in reader:
+                    if row:
+                        row.extend([""] * (width - len(row)))
+                        values = pick(row)
+                        yield values if len(columns) > 1 else (values,)
+                return
+            for row in reader:
+                if row:
+                    row.extend([""] * (width - len(row)))  # Absent columns read as ""
+                    values = pick(row)
+                    yield tuple(value or None for value in values) if len(columns) > 1 else (values or None,)
+
+
+def load_instance(courses, rooms, availability, conflicts=None, enrolments=None, time_slots=None):
+    """
+    Load an instance from files, streaming each one straight into a ProblemBuilder.
+    Every argument is a path to a CSV or JSON-lines file with these columns:
+    - rooms: room, capacity
+    - availability: professor, time_slot (one row per available slot)
+    - courses: course, and optionally students, room, professor (fixed room/professor)
+    - conflicts: course1, course2
+    - enrolments: student, course. Courses sharing a student conflict, and the
+      enrolments are added to the course sizes. A .npy file is memory-mapped
+      instead: either an (enrolments x 2) integer array of (student, course ID)
+      rows or a (students x courses) boolean matrix, course IDs being the
+      positions in the courses file.
+    - time_slots: time_slot. Without it, slots are added as availability
+      first mentions them, and nowhere else may name a new one.
+    """
+    builder = ProblemBuilder()
+    if time_slots is not None:
+        for (slot,) in _rows(time_slots, ("time_slot",)):
+            builder.add_time_slot(slot)
+    for room, capacity in _rows(rooms, ("room", "capacity")):
+        builder.add_room(room, int(capacity))
+    for professor, slot in _rows(availability, ("professor", "time_slot")):
+        if time_slots is None and slot not in builder.slot_index:
+            builder.add_time_slot(slot)
+        if professor not in builder.professor_index:
+            builder.add_professor(professor)
+        builder.add_availability(professor, slot)
+    for course, students, room, professor in _rows(courses, ("course",), ("students", "room", "professor")):
+        builder.add_course(course, int(students or 0), room, professor)
+
+    if conflicts is not None:
+        for course1, course2 in _rows(conflicts, ("course1", "course2")):
+            builder.add_conflict(course1, course2)
+
+    if enrolments is not None and enrolments.endswith(".npy"):
+        _add_enrolment_array(builder, np.load(enrolments, mmap_mode="r"))
+    elif enrolments is not None:
+        # Interned a batch of rows at a time, with the lookups mapped at C speed
+        student_index = defaultdict(count().__next__)
+        student_ids = array("l")
+        course_ids = array("l")
+        rows = _rows(enrolments, ("student", "course"))
+        while batch := list(islice(rows, 1 << 16)):
+            students, courses = zip(*batch)
+            student_ids.extend(map(student_index.__getitem__, students))
+            try:
+                course_ids.extend(map(builder.course_index.__getitem__, courses))
+            except KeyError as error:
+                raise ValueError(f"Unknown course: {error.args[0]!r}") from None
+        builder.add_enrolments(np.asarray(student_ids), np.asarray(course_ids))
+
+    return builder.build()
+
+
+def _add_enrolment_array(builder, matrix, chunk=1 << 16):
+    if matrix.dtype == bool:
+        # Dense (student x course) matrix, read a block of students at a time
+        if matrix.ndim != 2 or matrix.shape[1] != len(builder.course_index):
+            raise ValueError(f"Enrolment matrix has shape {matrix.shape}, expected (students, {len(builder.course_index)})")
+        for start in range(0, matrix.shape[0], chunk):
+            students, courses = np.nonzero(matrix[start:start + chunk])
+            builder.add_enrolments(students + start, courses)
+    else:
+        if matrix.ndim != 2 or matrix.shape[1] != 2:
+            raise ValueError(f"Enrolment pairs have shape {matrix.shape}, expected (enrolments, 2)")
+        builder.add_enrolments(matrix[:, 0], matrix[:, 1])
+
+
+def write_instance(problem, directory):
+    """
+    Write a Problem as CSV files that load_instance reads back.
+    Returns the paths as load_instance keyword arguments.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {
+        name: os.path.join(directory, f"{name}.csv")
+        for name in ("time_slots", "rooms", "availability", "courses", "conflicts")
+    }
+
+    def write(name, header, rows):
+        with open(paths[name], "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    write("time_slots", ["time_slot"], ((slot,) for slot in problem.time_slots))
+    write("rooms", ["room", "capacity"], zip(problem.rooms, problem.capacity.tolist()))
+    professors, slots = np.nonzero(problem.available)
+    write("availability", ["professor", "time_slot"], (
+        (problem.professors[p], problem.time_slots[t]) for p, t in zip(professors.tolist(), slots.tolist())
+    ))
+    write("courses", ["course", "students", "room", "professor"], (
+        (
+            course,
+            students,
+            problem.rooms[r] if r >= 0 else "",
+            problem.professors[p] if p >= 0 else "",
+        )
+        for course, students, r, p in zip(
+            problem.courses, problem.students.tolist(), problem.fixed_room.tolist(), problem.fixed_professor.tolist()
+        )
+    ))
+    write("conflicts", ["course1", "course2"], (
+        (problem.courses[a], problem.courses[b]) for a, b in problem.conflict_pairs.tolist()
+    ))
+    return paths
+
+
+def generate_instance(
+    n_courses,
+    conflict_density=0.05,
+    room_scarcity=0.8,
+    seed=None,
+    n_slots=40,
+    faculty_size=200,
+    cross_faculty=0.1,
+    courses_per_professor=3,
+    availability=0.7,
+    fixed_room_share=0.05,
+):
+    """
+    Generate a synthetic, university-like instance; the same seed gives the same instance.
+    - Courses are grouped into faculties of about faculty_size courses. Two
+      courses of one faculty conflict with probability conflict_density; on top
+      of that, each course gets cross_faculty times as many conflicts with other
+      faculties.
+    - Each course is taught by a fixed professor of its faculty, who teaches
+      about courses_per_professor courses and is available in a random share
+      `availability` of the slots (never fewer slots than courses).
+    - Course sizes are log-normal. room_scarcity is the share of (room, slot)
+      cells the courses fill, so 1.0 leaves no spare cell; room capacities are
+      drawn from the course sizes, and the largest room fits the largest course.
+    - A share fixed_room_share of the courses is fixed to a room large enough for it.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Faculties: courses are numbered faculty by faculty
+    n_faculties = max(1, round(n_courses / faculty_size))
+    faculty = np.sort(rng.integers(0, n_faculties, n_courses))
+    faculty_count = np.bincount(faculty, minlength=n_faculties)
+    faculty_start = np.concatenate([[0], np.cumsum(faculty_count)[:-1]])
+    students = np.clip(rng.lognormal(3.4, 0.7, n_courses), 5, 500).astype(np.int64)
+
+    # Rooms
+    n_rooms = max(1, math.ceil(n_courses / (n_slots * room_scarcity)))
+    capacity = np.ceil(rng.choice(students, n_rooms) * 1.2 / 10).astype(np.int64) * 10
+    capacity[np.argmax(capacity)] = max(capacity.max(), math.ceil(students.max(initial=0) / 10) * 10)
+
+    # Professors: the k-th course of a faculty goes to its (k mod professors)-th professor
+    faculty_professors = np.maximum(-(-faculty_count // courses_per_professor), 1)
+    professor_start = np.concatenate([[0], np.cumsum(faculty_professors)[:-1]])
+    rank = np.arange(n_courses) - faculty_start[faculty]
+    fixed_professor = professor_start[faculty] + rank % faculty_professors[faculty]
+    n_professors = int(faculty_professors.sum())
+    available = rng.random((n_professors, n_slots)) < availability
+    load = np.bincount(fixed_professor, minlength=n_professors)
+    for p in np.flatnonzero(available.sum(axis=1) < np.minimum(load, n_slots)):
+        available[p, rng.choice(n_slots, min(load[p], n_slots), replace=False)] = True
+
+    # Fixed rooms, drawn among the rooms large enough
+    fixed_room = np.full(n_courses, -1, dtype=np.int64)
+    by_capacity = np.argsort(capacity, kind="stable")
+    smallest = np.searchsorted(capacity[by_capacity], students)
+    chosen = np.flatnonzero((rng.random(n_courses) < fixed_room_share) & (smallest < n_rooms))
+    pick = smallest[chosen] + (rng.random(len(chosen)) * (n_rooms - smallest[chosen])).astype(np.int64)
+    fixed_room[chosen] = by_capacity[pick]
+
+    # Conflicts: sampled pairs within each faculty, then across faculties
+    within = rng.binomial(faculty_count * (faculty_count - 1) // 2, conflict_density)
+    sample_faculty = np.repeat(np.arange(n_faculties), within)
+    size = faculty_count[sample_faculty]
+    a = faculty_start[sample_faculty] + (rng.random(len(size)) * size).astype(np.int64)
+    b = faculty_start[sample_faculty] + (rng.random(len(size)) * size).astype(np.int64)
+    n_cross = rng.poisson(cross_faculty * within.sum()) if n_faculties > 1 else 0
+    c = rng.integers(0, n_courses, n_cross)
+    d = rng.integers(0, n_courses, n_cross)
+    keep = faculty[c] != faculty[d]
+    pairs = np.stack([np.concatenate([a, c[keep]]), np.concatenate([b, d[keep]])], axis=1)
+
+    return Problem(
+        [f"C{i}" for i in range(n_courses)],
+        [f"R{r}" for r in range(n_rooms)],
+        [f"T{t}" for t in range(n_slots)],
+        [f"P{p}" for p in range(n_professors)],
+        students,
+        capacity,
+        fixed_room,
+        fixed_professor,
+        available,
+        pairs,
+    )
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    start = time.perf_counter()
+    problem = generate_instance(50_000, seed=0)
+    print(f"Generated {problem} in {time.perf_counter() - start:.2f}s")
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_instance(problem, directory)
+        start = time.perf_counter()
+        loaded = load_instance(**paths)
+        print(f"Loaded {loaded} in {time.perf_counter() - start:.2f}s")
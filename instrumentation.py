@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+
+class Recorder:
+    """
+    Collects counters, gauges, samples and timing spans from solver runs.
+    Solvers take recorder=None and skip every hook without one, so
+    instrumentation costs nothing unless a Recorder is passed in.
+    Export with write_jsonl() or write_chrome_trace() (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, interval=0.01):
+        """
+        interval is the shortest time in seconds between two samples of one gauge.
+        """
+        self.origin = time.perf_counter()
+        self.interval = interval
+        self.counters = Counter()
+        self.peaks = {}
+        self.records = []  # Samples and spans, in the order they were recorded
+        self._last_gauge = {}
+
+    def _now(self):
+        return time.perf_counter() - self.origin
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def gauge(self, name, value):
+        """
+        Current level of something, e.g. a queue depth: keeps its peak and
+        samples it at most once per interval.
+        """
+        if name not in self.peaks or value > self.peaks[name]:
+            self.peaks[name] = value
+        now = self._now()
+        if now - self._last_gauge.get(name, -self.interval) >= self.interval:
+            self._last_gauge[name] = now
+            self.records.append({"type": "sample", "name": name, "time": now, "values": {"value": value}})
+
+    def sample(self, name, **values):
+        """
+        Record a set of values at this point in time, e.g. one GA generation.
+        """
+        self.records.append({"type": "sample", "name": name, "time": self._now(), "values": values})
+
+    def callback(self, name):
+        """
+        A function that samples the dict it is called with, e.g.
+        genetic_algorithm(on_generation=recorder.callback("genetic.generation")).
+        """
+        return lambda values: self.sample(name, **values)
+
+    @contextmanager
+    def span(self, name, **values):
+        """
+        Time the body of a with block.
+        """
+        start = self._now()
+        try:
+            yield
+        finally:
+            self.records.append({
+                "type": "span", "name": name, "time": start, "duration": self._now() - start,
+                "thread": threading.get_ident(), "values": values,
+            })
+
+    def totals(self):
+        return {"counters": dict(self.counters), "peaks": dict(self.peaks)}
+
+    def write_jsonl(self, path):
+        """
+        One JSON object per sample and span, then one with the counter totals and gauge peaks.
+        """
+        with open(path, "w") as file:
+            for record in self.records:
+                file.write(json.dumps(record) + "\n")
+            file.write(json.dumps({"type": "totals", "time": self._now(), **self.totals()}) + "\n")
+
+    def write_chrome_trace(self, path):
+        """
+        Spans become complete ("X") events and samples counter ("C") tracks;
+        only their numeric values are plotted. Times are in microseconds.
+        """
+        pid = os.getpid()
+        events = []
+        for record in self.records:
+            start = record["time"] * 1e6
+            if record["type"] == "span":
+                events.append({
+                    "name": record["name"], "ph": "X", "ts": start, "dur": record["duration"] * 1e6,
+                    "pid": pid, "tid": record["thread"], "args": record["values"],
+                })
+            else:
+                numbers = {
+                    key: value for key, value in record["values"].items()
+                    if isinstance(value, (int, float)) and not isinstance(value, bool)
+                }
+                events.append({"name": record["name"], "ph": "C", "ts": start, "pid": pid, "args": numbers})
+        end = self._now() * 1e6
+        for name, total in self.counters.items():
+            events.append({"name": name, "ph": "C", "ts": end, "pid": pid, "args": {"total": total}})
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+def span(recorder, name, **values):
+    """
+    recorder.span(name), or a no-op context when recorder is None.
+    """
+    return nullcontext() if recorder is None else recorder.span(name, **values)
+
+
+if __name__ == "__main__":
+    import sys
+
+    import backtracking
+    import genetic
+    import graph_bfs
+    import greedy_dp
+    from instances import generate_instance
+
+    problem = generate_instance(100, seed=0)
+    recorder = Recorder()
+    with recorder.span("genetic"):
+        genetic.solve_problem(problem, time_limit=2, on_generation=recorder.callback("genetic.generation"))
+    backtracking.solve_problem(problem, "mrv", time_limit=2, recorder=recorder)
+    graph_bfs.solve_problem(problem, recorder=recorder)
+    greedy_dp.solve_problem(problem, "matching", recorder=recorder)
+
+    for record in recorder.records:
+        if record["type"] == "span":
+            print(f"{record['name']}: {record['duration'] * 1000:.1f}ms")
+    print(recorder.totals())
+    if len(sys.argv) > 1:
+        recorder.write_chrome_trace(sys.argv[1])
+        print(f"Trace written to {sys.argv[1]}")
@@ -0,0 +1,398 @@
+import math
+import random
+import time
+
+import graph_bfs
+import graph_dfs
+import graph_dsatur
+import greedy_dp
+
+# Solvers whose schedules can seed a LocalSearch by name
+initial_solvers = {
+    "bfs": graph_bfs.solve_problem,
+    "dfs": graph_dfs.solve_problem,
+    "dsatur": graph_dsatur.solve_problem,
+    "greedy": greedy_dp.solve_problem,
+}
+
+
+class LocalSearch:
+    """
+    Local search over complete assignments (time slot, room, professor per
+    course) of a shared Problem, scored with genetic.py's penalties: 5 per
+    wrong fixed room or professor, unavailable professor, conflicting pair in
+    one slot and extra course per professor and slot, and 5 per student over a
+    room's capacity. Room clashes (extra courses per room and slot) cost
+    room_clash_weight on top; with 0 the penalty is exactly
+    10 - genetic.calculate_fitness.
+
+    Occupancy counters (per professor and slot, per room and slot, seats taken
+    per room and slot) and a conflict table (conflicting neighbours of every
+    course in every slot) are kept up to date, so delta() scores any
+    reassignment in O(1); applying one costs O(degree) for the conflict table.
+    """
+
+    def __init__(self, problem, schedule=None, seed=None, room_clash_weight=5):
+        """
+        schedule is an initial {course: {"time_slot", "room", "professor"}}.
+        Without one, courses are placed at random; courses it leaves out (or
+        assigns to unknown names) are placed one by one at their cheapest slot and room.
+        """
+        self.problem = problem
+        self.rng = random.Random(seed)
+        self.room_clash_weight = room_clash_weight
+        self.n_slots = len(problem.time_slots)
+        self.students = problem.students.tolist()
+        self.capacity = problem.capacity.tolist()
+        self.fixed_room = problem.fixed_room.tolist()
+        self.fixed_professor = problem.fixed_professor.tolist()
+        self.available = problem.available.ravel().tolist()  # professor * n_slots + slot
+        indptr, indices = problem.conflict_indptr.tolist(), problem.conflict_indices.tolist()
+        self.neighbours = [indices[indptr[i]:indptr[i + 1]] for i in range(len(problem.courses))]
+        self.slot_professors = [problem.professors_in(t).tolist() for t in range(self.n_slots)]
+
+        slots, rooms, professors = [], [], []
+        missing = []
+        for i, course in enumerate(problem.courses):
+            details = (schedule or {}).get(course, {})
+            t = problem.slot_index.get(details.get("time_slot"))
+            r = problem.room_index.get(details.get("room"))
+            p = problem.professor_index.get(details.get("professor"))
+            if schedule is not None and None in (t, r, p):
+                missing.append(i)
+            if t is None:
+                t = self.rng.randrange(self.n_slots)
+            if r is None:
+                r = self.fixed_room[i] if self.fixed_room[i] >= 0 else self.rng.randrange(len(self.capacity))
+            if p is None:
+                p = self._professor_for(i, t, -1)
+            slots.append(t)
+            rooms.append(r)
+            professors.append(p)
+        self._load(slots, rooms, professors)
+
+        for i in missing:
+            options = range(len(self.capacity)) if self.fixed_room[i] < 0 else [self.fixed_room[i]]
+            best, best_delta = None, None
+            for t in range(self.n_slots):
+                p = self._professor_for(i, t, self.professor[i])
+                for r in options:
+                    d = self.delta(i, t, r, p)
+                    if best_delta is None or d < best_delta:
+                        best, best_delta = (t, r, p), d
+            self.move(i, *best, best_delta)
+
+    def _load(self, slots, rooms, professors):
+        """
+        Set the assignment and rebuild every counter and the penalty from scratch.
+        """
+        n_slots = self.n_slots
+        self.slot, self.room, self.professor = list(slots), list(rooms), list(professors)
+        self.professor_count = [0] * (len(self.problem.professors) * n_slots)
+        self.room_count = [0] * (len(self.capacity) * n_slots)
+        self.room_load = [0] * (len(self.capacity) * n_slots)
+        self.clash = [0] * (len(self.slot) * n_slots)  # course * n_slots + slot
+        for i, (t, r, p) in enumerate(zip(self.slot, self.room, self.professor)):
+            self.professor_count[p * n_slots + t] += 1
+            self.room_count[r * n_slots + t] += 1
+            self.room_load[r * n_slots + t] += self.students[i]
+            for j in self.neighbours[i]:
+                self.clash[j * n_slots + t] += 1
+
+        penalty = 0
+        for i, (t, r, p) in enumerate(zip(self.slot, self.room, self.professor)):
+            penalty += 5 * ((0 <= self.fixed_room[i] != r) + (0 <= self.fixed_professor[i] != p))
+            penalty += 5 * (not self.available[p * n_slots + t])
+        # Every conflicting pair in one slot is counted from both ends
+        penalty += 5 * (sum(self.clash[i * n_slots + t] for i, t in enumerate(self.slot)) // 2)
+        penalty += 5 * sum(count - 1 for count in self.professor_count if count > 1)
+        penalty += self.room_clash_weight * sum(count - 1 for count in self.room_count if count > 1)
+        for cell, load in enumerate(self.room_load):
+            penalty += 5 * max(load - self.capacity[cell // n_slots], 0)
+        self.penalty = penalty
+
+    def _professor_for(self, i, t, current):
+        # The fixed professor, else the current one if available in slot t, else any available one
+        if self.fixed_professor[i] >= 0:
+            return self.fixed_professor[i]
+        if current >= 0 and self.available[current * self.n_slots + t]:
+            return current
+        options = self.slot_professors[t]
+        return self.rng.choice(options) if options else max(current, 0)
+
+    def delta(self, i, t2, r2, p2):
+        """
+        Change in penalty if course i moved to slot t2, room r2 and professor p2.
+        """
+        n_slots = self.n_slots
+        t, r, p = self.slot[i], self.room[i], self.professor[i]
+        d = 0
+        fixed = self.fixed_room[i]
+        if fixed >= 0:
+            d += 5 * ((r2 != fixed) - (r != fixed))
+        fixed = self.fixed_professor[i]
+        if fixed >= 0:
+            d += 5 * ((p2 != fixed) - (p != fixed))
+        d += 5 * (self.available[p * n_slots + t] - self.available[p2 * n_slots + t2])
+        if t2 != t:
+            d += 5 * (self.clash[i * n_slots + t2] - self.clash[i * n_slots + t])
+        if p2 != p or t2 != t:
+            d += 5 * ((self.professor_count[p2 * n_slots + t2] > 0) - (self.professor_count[p * n_slots + t] > 1))
+        if r2 != r or t2 != t:
+            old, new = r * n_slots + t, r2 * n_slots + t2
+            d += self.room_clash_weight * ((self.room_count[new] > 0) - (self.room_count[old] > 1))
+            size = self.students[i]
+            load, capacity = self.room_load[old], self.capacity[r]
+            d += 5 * (max(load - size - capacity, 0) - max(load - capacity, 0))
+            load, capacity = self.room_load[new], self.capacity[r2]
+            d += 5 * (max(load + size - capacity, 0) - max(load - capacity, 0))
+        return d
+
+    def move(self, i, t2, r2, p2, delta=None):
+        """
+        Reassign course i; delta is self.delta(i, t2, r2, p2) if already known.
+        Returns the change in penalty.
+        """
+        if delta is None:
+            delta = self.delta(i, t2, r2, p2)
+        n_slots = self.n_slots
+        t, r, p = self.slot[i], self.room[i], self.professor[i]
+        self.professor_count[p * n_slots + t] -= 1
+        self.professor_count[p2 * n_slots + t2] += 1
+        self.room_count[r * n_slots + t] -= 1
+        self.room_count[r2 * n_slots + t2] += 1
+        self.room_load[r * n_slots + t] -= self.students[i]
+        self.room_load[r2 * n_slots + t2] += self.students[i]
+        if t2 != t:
+            clash = self.clash
+            for j in self.neighbours[i]:
+                clash[j * n_slots + t] -= 1
+                clash[j * n_slots + t2] += 1
+        self.slot[i], self.room[i], self.professor[i] = t2, r2, p2
+        self.penalty += delta
+        return delta
+
+    def _swap(self, i, j):
+        """
+        Swap the slots of courses i and j; returns the undo list for _undo().
+        """
+        ti, tj = self.slot[i], self.slot[j]
+        undo = [(i, ti, self.room[i], self.professor[i])]
+        self.move(i, tj, self.room[i], self._professor_for(i, tj, self.professor[i]))
+        undo.append((j, tj, self.room[j], self.professor[j]))
+        self.move(j, ti, self.room[j], self._professor_for(j, ti, self.professor[j]))
+        return undo
+
+    def kempe_chain(self, i, t2, limit=None):
+        """
+        The courses reachable from course i through conflicts while staying in
+        i's slot or t2; swapping their two slots keeps the conflicts between them
+        and with every other course unchanged. None if longer than limit.
+        """
+        slots = (self.slot[i], t2)
+        chain = [i]
+        seen = {i}
+        for course in chain:
+            for j in self.neighbours[course]:
+                if j not in seen and self.slot[j] in slots:
+                    seen.add(j)
+                    chain.append(j)
+                    if limit is not None and len(chain) > limit:
+                        return None
+        return chain
+
+    def _kempe(self, chain, t1, t2):
+        undo = []
+        for course in chain:
+            t = self.slot[course]
+            other = t2 if t == t1 else t1
+            undo.append((course, t, self.room[course], self.professor[course]))
+            self.move(course, other, self.room[course], self._professor_for(course, other, self.professor[course]))
+        return undo
+
+    def _undo(self, undo):
+        for course, t, r, p in reversed(undo):
+            self.move(course, t, r, p)
+
+    def _random_move(self, i):
+        # A single-course move as (t2, r2, p2): a new slot (two times in three) or a new room
+        rng = self.rng
+        t, r, p = self.slot[i], self.room[i], self.professor[i]
+        if self.fixed_room[i] >= 0 or rng.random() < 0.67:
+            t2 = rng.randrange(self.n_slots)
+            return t2, r, self._professor_for(i, t2, p)
+        return t, rng.randrange(len(self.capacity)), p
+
+    def anneal(self, moves=None, time_limit=None, start_temperature=1.0, end_temperature=0.05,
+               swap_rate=0.1, kempe_rate=0.05, kempe_limit=50):
+        """
+        Simulated annealing until `moves` moves have been tried or time_limit
+        seconds have passed (200 moves per course if neither is given); the
+        temperature falls geometrically over the budget. Slot and room moves are
+        scored before they are applied; swaps and Kempe-chain swaps (at
+        swap_rate and kempe_rate) are applied, scored, and undone if rejected.
+        Ends in the best assignment seen. Returns the number of moves tried.
+        """
+        if moves is None and time_limit is None:
+            moves = 200 * len(self.slot)
+        rng = self.rng
+        n = len(self.slot)
+        start = time.perf_counter()
+        temperature = start_temperature
+        cooling = math.log(end_temperature / start_temperature)
+        best = self.penalty
+        best_state = None  # None while the current assignment is the best one
+        tried = 0
+        while self.penalty > 0:
+            if tried % 1000 == 0:
+                progress = 0.0
+                if moves is not None:
+                    progress = tried / moves
+                if time_limit is not None:
+                    progress = max(progress, (time.perf_counter() - start) / time_limit)
+                if progress >= 1:
+                    break
+                temperature = start_temperature * math.exp(cooling * progress)
+            tried += 1
+
+            i = rng.randrange(n)
+            kind = rng.random()
+            if kind < swap_rate + kempe_rate:
+                # Compound moves: apply first, then decide
+                before = self.penalty
+                if kind < swap_rate:
+                    j = rng.randrange(n)
+                    if self.slot[i] == self.slot[j]:
+                        continue
+                    undo = self._swap(i, j)
+                else:
+                    t1, t2 = self.slot[i], rng.randrange(self.n_slots)
+                    chain = self.kempe_chain(i, t2, kempe_limit) if t2 != t1 else None
+                    if chain is None:
+                        continue
+                    undo = self._kempe(chain, t1, t2)
+                d = self.penalty - before
+                if d > 0:
+                    if rng.random() >= math.exp(-d / temperature):
+                        self._undo(undo)
+                        continue
+                    if best_state is None:
+                        # Leaving the best assignment: remember it as it was before the move
+                        best_state = (list(self.slot), list(self.room), list(self.professor))
+                        for course, t, r, p in undo:
+                            best_state[0][course], best_state[1][course], best_state[2][course] = t, r, p
+            else:
+                t2, r2, p2 = self._random_move(i)
+                d = self.delta(i, t2, r2, p2)
+                if d > 0:
+                    if rng.random() >= math.exp(-d / temperature):
+                        continue
+                    if best_state is None:
+                        best_state = (list(self.slot), list(self.room), list(self.professor))
+                self.move(i, t2, r2, p2, d)
+            if self.penalty < best:
+                best, best_state = self.penalty, None
+
+        if best_state is not None and best < self.penalty:
+            self._load(*best_state)
+        return tried
+
+    def tabu(self, iterations=None, time_limit=None, sample=50, tenure=10):
+        """
+        Tabu search: each iteration scores `sample` random single-course moves and
+        makes the best one that is not tabu (or that beats the best penalty so
+        far), even if it is worse. A course may not return to the slot it left
+        for tenure to 2 * tenure iterations. Runs for `iterations` iterations or
+        time_limit seconds (20 per course if neither is given) and ends in the
+        best assignment seen. Returns the number of moves scored.
+        """
+        if iterations is None and time_limit is None:
+            iterations = 20 * len(self.slot)
+        rng = self.rng
+        n = len(self.slot)
+        start = time.perf_counter()
+        tabu_until = {}  # (course, slot) -> first iteration it may be used again
+        best = self.penalty
+        best_state = None
+        iteration = 0
+        while self.penalty > 0:
+            if iterations is not None and iteration >= iterations:
+                break
+            if time_limit is not None and iteration % 100 == 0 and time.perf_counter() - start >= time_limit:
+                break
+            iteration += 1
+
+            chosen, chosen_delta = None, None
+            for _ in range(sample):
+                i = rng.randrange(n)
+                t2, r2, p2 = self._random_move(i)
+                if (t2, r2, p2) == (self.slot[i], self.room[i], self.professor[i]):
+                    continue
+                d = self.delta(i, t2, r2, p2)
+                if tabu_until.get((i, t2), 0) > iteration and self.penalty + d >= best:
+                    continue
+                if chosen_delta is None or d < chosen_delta:
+                    chosen, chosen_delta = (i, t2, r2, p2), d
+            if chosen is None:
+                continue
+
+            i, t2, r2, p2 = chosen
+            if chosen_delta > 0 and best_state is None:
+                best_state = (list(self.slot), list(self.room), list(self.professor))
+            if t2 != self.slot[i]:
+                tabu_until[(i, self.slot[i])] = iteration + tenure + rng.randrange(tenure + 1)
+            self.move(i, t2, r2, p2, chosen_delta)
+            if self.penalty < best:
+                best, best_state = self.penalty, None
+
+        if best_state is not None and best < self.penalty:
+            self._load(*best_state)
+        return iteration * sample
+
+    def schedule(self):
+        """
+        The current assignment as {course: {"time_slot", "room", "professor"}}.
+        """
+        problem = self.problem
+        return {
+            course: {
+                "time_slot": problem.time_slots[t],
+                "room": problem.rooms[r],
+                "professor": problem.professors[p],
+            }
+            for course, t, r, p in zip(problem.courses, self.slot, self.room, self.professor)
+        }
+
+
+def solve_problem(problem, method="anneal", initial="dsatur", seed=None, room_clash_weight=5, **options):
+    """
+    Improve a schedule of a shared Problem with local search and return it.
+    method is "anneal" or "tabu" (options go to LocalSearch.anneal/tabu);
+    initial is a schedule dict, the name of a solver in initial_solvers, or
+    None for a random start.
+    """
+    if method not in ("anneal", "tabu"):
+        raise ValueError(f"Unknown method: {method}")
+    if isinstance(initial, str):
+        initial = initial_solvers[initial](problem)
+    search = LocalSearch(problem, initial, seed, room_clash_weight)
+    getattr(search, method)(**options)
+    return search.schedule()
+
+
+if __name__ == "__main__":
+    from instances import generate_instance
+
+    problem = generate_instance(1000, seed=0)
+    for initial in ("dsatur", "greedy", None):
+        schedule = initial_solvers[initial](problem) if initial else None
+        for method in ("anneal", "tabu"):
+            search = LocalSearch(problem, schedule, seed=0)
+            before = search.penalty
+            start = time.perf_counter()
+            moves = getattr(search, method)(time_limit=5)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{method} from {initial or 'random'}: penalty {before} -> {search.penalty} "
+                f"({moves / elapsed:,.0f} moves/s), {len(problem.violations(search.schedule()))} violations"
+            )
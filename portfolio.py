@@ -0,0 +1,208 @@
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import backtracking
+import genetic
+import graph_bfs
+import graph_dfs
+import graph_dsatur
+import greedy_dp
+import local_search
+
+# The graph schedulers, fastest and usually best first; one member runs them in turn
+graph_solvers = {
+    "dsatur": graph_dsatur.solve_problem,
+    "greedy_dp": greedy_dp.solve_problem,
+    "dfs": graph_dfs.solve_problem,
+    "bfs": graph_bfs.solve_problem,
+}
+
+# Rough seconds per course x slot x room x professor of each graph scheduler,
+# rounded up from generate_instance() instances of 1500 and 4000 courses (bfs
+# scans every combination for a course it cannot place, the others stay far below)
+graph_cost = {"dsatur": 2e-11, "greedy_dp": 1e-11, "dfs": 1e-11, "bfs": 1.1e-9}
+
+default_members = ("graph", "genetic", "backtracking", "anneal")
+seed_wait = 1.0  # Longest a seeded member waits for a first incumbent, in seconds
+stop_wait = 0.5  # How long members get to report after the deadline before they are terminated
+
+
+def energy(problem, schedule):
+    """
+    Sum of the capacities of the rooms a schedule uses, as in Timetabling.energy_usage.
+    """
+    return sum(
+        int(problem.capacity[problem.room_index[details["room"]]])
+        for details in schedule.values() if details.get("room") in problem.room_index
+    )
+
+
+def score(problem, schedule):
+    """
+    How good a schedule is, lower is better: (violations, energy).
+    """
+    return len(problem.violations(schedule)), energy(problem, schedule)
+
+
+def graph_estimate(name, problem):
+    """
+    Rough worst-case running time in seconds of graph scheduler `name` on `problem`.
+    """
+    size = len(problem.courses) * len(problem.time_slots) * len(problem.rooms) * len(problem.professors)
+    return graph_cost[name] * size
+
+
+def _init_worker():
+    sys.stdout = open(os.devnull, "w")  # Solvers print their progress
+
+
+def _wait_for_seed(best, deadline):
+    # The graph member usually reports within milliseconds
+    give_up = min(deadline, time.time() + seed_wait)
+    while time.time() < give_up:
+        schedule = best.get("schedule")
+        if schedule is not None:
+            return schedule
+        time.sleep(0.01)
+    return best.get("schedule")
+
+
+def _run_member(member, problem, deadline, incumbents, best, stop, slowdown=1.0):
+    """
+    Run one portfolio member in a worker process until `deadline` (a
+    time.time() value) or until `stop` is set. Every schedule it finds is put
+    on `incumbents` as (source, schedule); `best` is the manager dict the
+    parent keeps the best validated schedule and its energy in. slowdown is
+    how many members share each CPU, which stretches graph_estimate().
+    Returns True if the member proved its last schedule optimal.
+    """
+    def report(source, schedule):
+        incumbents.put((source, dict(schedule)))
+
+    if member == "graph":
+        # A scheduler cannot be interrupted, so one that would overrun the deadline is skipped
+        for name, solve in graph_solvers.items():
+            if stop.is_set() or time.time() + slowdown * graph_estimate(name, problem) >= deadline:
+                continue
+            report(name, solve(problem) or {})
+        return False
+
+    if member == "genetic":
+        # Seeded with the best schedule so far; stops once it has no violations
+        seed = _wait_for_seed(best, deadline)
+        genetic.load_problem(problem)
+        schedule, _ = genetic.genetic_algorithm(
+            elite_size=1, target_fitness=10, time_limit=max(deadline - time.time(), 0),
+            seeds=[] if seed is None else [seed],
+        )
+        report("genetic", schedule)
+        return False
+
+    if member == "anneal":
+        seed = _wait_for_seed(best, deadline)
+        search = local_search.LocalSearch(problem, seed, seed=0)
+        search.anneal(time_limit=max(deadline - time.time(), 0))
+        report("anneal", search.schedule())
+        return False
+
+    # "backtracking": branch and bound on energy, pruned by the best valid schedule of any member
+    timetabling = backtracking.Timetabling.from_problem(problem)
+    timetabling.should_stop = stop.is_set
+    _, optimal = timetabling.optimize_energy(
+        time_limit=max(deadline - time.time(), 0),
+        on_incumbent=lambda schedule, _: report("backtracking", schedule),
+        upper_bound=lambda: best.get("energy"),
+    )
+    return optimal
+
+
+def solve_portfolio(problem, time_limit=10.0, members=default_members):
+    """
+    Race the solvers on `problem` in separate processes for at most
+    time_limit seconds and return (schedule, source) for the best schedule
+    any of them found: fewest violations (checked here with
+    Problem.violations), then least energy. Members:
+    - "graph": the graph schedulers in turn (see graph_solvers), skipping any
+      that graph_estimate() says would not finish in time;
+    - "genetic": genetic_algorithm, seeded with the best schedule so far;
+    - "anneal": simulated annealing from the best schedule so far;
+    - "backtracking": Timetabling.optimize_energy, which only looks for
+      schedules using less energy than the best valid one any member found.
+    The race ends early when every member is done, e.g. once branch and bound
+    proves a schedule optimal. At the deadline the members get stop_wait
+    seconds to report and are then terminated. A member that fails is
+    reported on stderr and the race goes on without it.
+    """
+    unknown = set(members) - set(default_members)
+    if unknown:
+        raise ValueError(f"Unknown members: {', '.join(sorted(unknown))}")
+    start = time.time()
+    deadline = start + time_limit
+    best_schedule, best_score, source = {}, None, None
+
+    with multiprocessing.Manager() as manager:
+        incumbents = manager.Queue()
+        best = manager.dict()
+        stop = manager.Event()
+
+        def consider(member_source, schedule):
+            nonlocal best_schedule, best_score, source
+            candidate = score(problem, schedule)
+            if best_score is None or candidate < best_score:
+                best_schedule, best_score, source = schedule, candidate, member_source
+                best["schedule"] = schedule
+                if candidate[0] == 0:
+                    best["energy"] = candidate[1]
+
+        slowdown = max(1.0, len(members) / (os.cpu_count() or 1))
+        pool = ProcessPoolExecutor(max_workers=len(members), initializer=_init_worker)
+        futures = [
+            pool.submit(_run_member, member, problem, deadline, incumbents, best, stop, slowdown)
+            for member in members
+        ]
+        while time.time() < deadline:
+            try:
+                consider(*incumbents.get(timeout=min(0.05, max(deadline - time.time(), 0.001))))
+            except queue.Empty:
+                if all(future.done() for future in futures):
+                    break
+        stop.set()
+        wait(futures, timeout=stop_wait)
+        failed = [
+            (member, future.exception()) for member, future in zip(members, futures)
+            if future.done() and not future.cancelled() and future.exception() is not None
+        ]
+        # Members still running at this point are terminated, not waited for
+        processes = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=1)
+
+        # Whatever was reported while the members wound down
+        while True:
+            try:
+                consider(*incumbents.get_nowait())
+            except queue.Empty:
+                break
+        for member, error in failed:
+            print(f"Portfolio member {member} failed: {error!r}", file=sys.stderr)
+
+    return best_schedule, source
+
+
+if __name__ == "__main__":
+    from instances import generate_instance
+    from problem import example_problem
+
+    for problem in (example_problem(), generate_instance(300, seed=1)):
+        start = time.perf_counter()
+        schedule, source = solve_portfolio(problem, time_limit=10)
+        violations, used = score(problem, schedule)
+        print(f"{problem}: {violations} violations, energy {used}, from {source} "
+              f"in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,553 @@
+from array import array
+
+import numpy as np
+
+
+class Problem:
+    """
+    One timetabling instance, shared by every solver.
+    Courses, rooms, time slots and professors are interned to dense integer IDs
+    (their position in the name tuples). Per-course and per-room data are
+    NumPy arrays, and the availability and conflict indexes are built once here.
+    Build instances with ProblemBuilder or one of the from_* converters below.
+    """
+
+    __slots__ = (
+        "courses", "rooms", "time_slots", "professors",
+        "course_index", "room_index", "slot_index", "professor_index",
+        "students", "capacity", "fixed_room", "fixed_professor", "available",
+        "slot_professor_indptr", "slot_professors",
+        "conflict_pairs", "conflict_indptr", "conflict_indices",
+    )
+
+    def __init__(self, courses, rooms, time_slots, professors, students, capacity,
+                 fixed_room, fixed_professor, available, conflict_pairs):
+        """
+        courses, rooms, time_slots and professors are sequences of names; everything
+        else refers to them by ID. students, fixed_room and fixed_professor have one
+        entry per course (-1 means not fixed), capacity one per room, available is a
+        (professor x slot) boolean matrix and conflict_pairs a sequence of course pairs.
+        """
+        self.courses = tuple(courses)
+        self.rooms = tuple(rooms)
+        self.time_slots = tuple(time_slots)
+        self.professors = tuple(professors)
+        self.course_index = {course: i for i, course in enumerate(self.courses)}
+        self.room_index = {room: r for r, room in enumerate(self.rooms)}
+        self.slot_index = {slot: t for t, slot in enumerate(self.time_slots)}
+        self.professor_index = {professor: p for p, professor in enumerate(self.professors)}
+
+        n = len(self.courses)
+        self.students = np.asarray(students, dtype=np.int64).reshape(n)
+        self.capacity = np.asarray(capacity, dtype=np.int64).reshape(len(self.rooms))
+        self.fixed_room = np.asarray(fixed_room, dtype=np.int64).reshape(n)
+        self.fixed_professor = np.asarray(fixed_professor, dtype=np.int64).reshape(n)
+        self.available = np.asarray(available, dtype=bool).reshape(len(self.professors), len(self.time_slots))
+
+        # Professors available in slot t: slot_professors[slot_professor_indptr[t]:slot_professor_indptr[t + 1]]
+        by_slot = self.available.T
+        self.slot_professor_indptr = np.concatenate([[0], np.cumsum(by_slot.sum(axis=1))]).astype(np.int64)
+        self.slot_professors = np.nonzero(by_slot)[1].astype(np.int64)
+
+        # Conflicts: unique (a < b) pairs, plus a symmetric CSR adjacency
+        # (the neighbours of course i are conflict_indices[conflict_indptr[i]:conflict_indptr[i + 1]])
+        pairs = np.asarray(conflict_pairs, dtype=np.int64).reshape(-1, 2)
+        low, high = np.minimum(pairs[:, 0], pairs[:, 1]), np.maximum(pairs[:, 0], pairs[:, 1])
+        keys = _sorted_unique((low * n + high)[low != high])
+        self.conflict_pairs = np.stack(np.divmod(keys, max(n, 1)), axis=1)
+        both = np.sort(np.concatenate([keys, self.conflict_pairs[:, 1] * n + self.conflict_pairs[:, 0]]))
+        rows, self.conflict_indices = np.divmod(both, max(n, 1))
+        self.conflict_indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=n))]).astype(np.int64)
+
+    def __repr__(self):
+        return (
+            f"Problem({len(self.courses)} courses, {len(self.rooms)} rooms, "
+            f"{len(self.time_slots)} time slots, {len(self.professors)} professors, "
+            f"{len(self.conflict_pairs)} conflicts)"
+        )
+
+    def neighbours(self, i):
+        """
+        IDs of the courses that conflict with course i.
+        """
+        return self.conflict_indices[self.conflict_indptr[i]:self.conflict_indptr[i + 1]]
+
+    def professors_in(self, t):
+        """
+        IDs of the professors available in slot t.
+        """
+        return self.slot_professors[self.slot_professor_indptr[t]:self.slot_professor_indptr[t + 1]]
+
+    def violations(self, schedule):
+        """
+        List the hard-constraint violations of a schedule in the standard
+        {course: {"time_slot", "room", "professor"}} format as (kind, course) pairs.
+        Kinds: "unknown" (a name not in the problem), "unscheduled", "room" and
+        "professor" (fixed one not used), "availability", "capacity", "conflict",
+        "room_clash" and "professor_clash". Pairwise violations are reported on
+        one course of the pair.
+        """
+        found = []
+        slot_of = np.full(len(self.courses), -1, dtype=np.int64)
+        seen = np.zeros(len(self.courses), dtype=bool)
+        room_used = set()
+        professor_used = set()
+
+        for course, details in schedule.items():
+            i = self.course_index.get(course)
+            room = self.room_index.get(details.get("room"))
+            slot = self.slot_index.get(details.get("time_slot"))
+            professor = self.professor_index.get(details.get("professor"))
+            if i is None or room is None or slot is None or professor is None:
+                found.append(("unknown", course))
+                if i is not None:
+                    seen[i] = True
+                continue
+            seen[i] = True
+
+            if self.fixed_room[i] >= 0 and room != self.fixed_room[i]:
+                found.append(("room", course))
+            if self.fixed_professor[i] >= 0 and professor != self.fixed_professor[i]:
+                found.append(("professor", course))
+            if not self.available[professor, slot]:
+                found.append(("availability", course))
+            if self.students[i] > self.capacity[room]:
+                found.append(("capacity", course))
+            if (room, slot) in room_used:
+                found.append(("room_clash", course))
+            room_used.add((room, slot))
+            if (professor, slot) in professor_used:
+                found.append(("professor_clash", course))
+            professor_used.add((professor, slot))
+            slot_of[i] = slot
+
+        found.extend(("unscheduled", self.courses[i]) for i in np.flatnonzero(~seen))
+
+        slots = slot_of[self.conflict_pairs]
+        clashing = (slots[:, 0] >= 0) & (slots[:, 0] == slots[:, 1])
+        found.extend(("conflict", self.courses[b]) for b in self.conflict_pairs[clashing, 1])
+        return found
+
+    def penalty(self, schedule):
+        """
+        Total penalty of a schedule: 5 per violation, as in genetic.py.
+        """
+        return 5 * len(self.violations(schedule))
+
+
+class ProblemBuilder:
+    """
+    Collects an instance one item at a time and builds the Problem once.
+    Every name is interned to the next free ID when it is added; a name must be
+    added before anything refers to it (slots before the professors available in
+    them, rooms and professors before the courses fixed to them, courses before
+    their conflicts). Data is kept in flat arrays, not per-item dicts.
+    """
+
+    def __init__(self):
+        self.course_index = {}
+        self.room_index = {}
+        self.slot_index = {}
+        self.professor_index = {}
+        self.students = array("l")
+        self.fixed_room = array("l")
+        self.fixed_professor = array("l")
+        self.capacity = array("l")
+        self.availability = array("l")  # Flat (professor, slot) pairs
+        self.conflicts = array("l")  # Flat (course, course) pairs
+        self.conflict_blocks = []  # (k x 2) arrays of course ID pairs
+        self.enrolled = None  # Enrolment counts per course, added to the sizes
+
+    @staticmethod
+    def _intern(index, kind, name):
+        if name in index:
+            raise ValueError(f"Duplicate {kind}: {name!r}")
+        index[name] = len(index)
+        return index[name]
+
+    @staticmethod
+    def _lookup(index, kind, name):
+        try:
+            return index[name]
+        except KeyError:
+            raise ValueError(f"Unknown {kind}: {name!r}") from None
+
+    def add_time_slot(self, name):
+        return self._intern(self.slot_index, "time slot", name)
+
+    def add_room(self, name, capacity):
+        r = self._intern(self.room_index, "room", name)
+        self.capacity.append(int(capacity))
+        return r
+
+    def add_professor(self, name, slots=()):
+        """
+        Add a professor available in the given (already added) time slots.
+        """
+        p = self._intern(self.professor_index, "professor", name)
+        for slot in slots:
+            self.availability.extend((p, self._lookup(self.slot_index, "time slot", slot)))
+        return p
+
+    def add_availability(self, professor, slot):
+        """
+        Make an already added professor available in an already added slot.
+        """
+        self.availability.extend((
+            self._lookup(self.professor_index, "professor", professor),
+            self._lookup(self.slot_index, "time slot", slot),
+        ))
+
+    def add_course(self, name, students=0, room=None, professor=None):
+        """
+        Add a course, optionally fixed to a room and/or taught by a given professor.
+        """
+        fixed_room = -1 if room is None else self._lookup(self.room_index, "room", room)
+        fixed_professor = -1 if professor is None else self._lookup(self.professor_index, "professor", professor)
+        i = self._intern(self.course_index, "course", name)
+        self.students.append(int(students))
+        self.fixed_room.append(fixed_room)
+        self.fixed_professor.append(fixed_professor)
+        return i
+
+    def add_conflict(self, course1, course2):
+        self.conflicts.extend((
+            self._lookup(self.course_index, "course", course1),
+            self._lookup(self.course_index, "course", course2),
+        ))
+
+    def add_conflict_pairs(self, pairs):
+        """
+        Add conflicts in bulk as a (k x 2) array of course IDs.
+        """
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        if len(pairs) and (pairs.min() < 0 or pairs.max() >= len(self.course_index)):
+            raise ValueError("Unknown course ID in conflict pairs")
+        self.conflict_blocks.append(pairs)
+
+    def add_enrolments(self, students, courses):
+        """
+        Add enrolments as parallel arrays of student labels (non-negative
+        integers) and course IDs. Each distinct enrolment adds one to its
+        course's size, and every two courses sharing a student conflict.
+        """
+        n = len(self.course_index)
+        students = np.asarray(students, dtype=np.int64)
+        courses = np.asarray(courses, dtype=np.int64)
+        if len(courses) and (courses.min() < 0 or courses.max() >= n):
+            raise ValueError("Unknown course ID in enrolments")
+        if len(students) and students.min() < 0:
+            raise ValueError("Negative student label in enrolments")
+
+        # One sort by student, then course; duplicates become adjacent
+        keys = _sorted_unique(students * n + courses)
+        students, courses = np.divmod(keys, max(n, 1))
+
+        counts = np.bincount(courses, minlength=n)
+        if self.enrolled is not None:
+            counts[:len(self.enrolled)] += self.enrolled
+        self.enrolled = counts
+        self.conflict_blocks.append(shared_student_pairs(students, courses, n))
+
+    def build(self):
+        available = np.zeros((len(self.professor_index), len(self.slot_index)), dtype=bool)
+        pairs = np.asarray(self.availability, dtype=np.int64)
+        available[pairs[0::2], pairs[1::2]] = True
+        students = np.array(self.students, dtype=np.int64)
+        if self.enrolled is not None:
+            students[:len(self.enrolled)] += self.enrolled
+        conflicts = np.concatenate([np.asarray(self.conflicts, dtype=np.int64).reshape(-1, 2), *self.conflict_blocks])
+        return Problem(
+            self.course_index, self.room_index, self.slot_index, self.professor_index,
+            students, self.capacity, self.fixed_room, self.fixed_professor,
+            available, conflicts,
+        )
+
+
+def _sorted_unique(keys):
+    # Sort-based unique; np.unique is several times slower on large int64 arrays
+    keys = np.sort(keys)
+    return keys[np.concatenate([[True], keys[1:] != keys[:-1]])] if len(keys) else keys
+
+
+def shared_student_pairs(students, courses, n_courses):
+    """
+    Pairs of courses that share a student, from parallel enrolment arrays sorted
+    by student and then course. The courses of one student are adjacent, so
+    the pairs k apart are found with one vectorized comparison per k, up to the
+    largest number of courses a student takes. Pairs may repeat; Problem
+    removes the duplicates.
+    """
+    blocks = []
+    k = 1
+    while k < len(students):
+        same = students[k:] == students[:-k]
+        if not same.any():
+            break
+        blocks.append(np.stack([courses[:-k][same], courses[k:][same]], axis=1))
+        k += 1
+    return np.concatenate(blocks) if blocks else np.zeros((0, 2), dtype=np.int64)
+
+
+def from_genetic(courses, professors, rooms, time_slots, constraints):
+    """
+    Convert the genetic.py format (name lists, a {room: capacity} dict and a
+    constraints dict). Conflicts and availability naming unknown courses or
+    slots are ignored, as genetic.py does.
+    """
+    builder = ProblemBuilder()
+    for slot in time_slots:
+        builder.add_time_slot(slot)
+    for room, capacity in rooms.items():
+        builder.add_room(room, capacity)
+    availability = constraints["professor_availability"]
+    for professor in professors:
+        builder.add_professor(professor, [slot for slot in availability.get(professor, []) if slot in builder.slot_index])
+
+    sizes = constraints.get("room_capacity_constraints") or {}
+    fixed_rooms = constraints["room_assignment"]
+    fixed_professors = constraints.get("professor_assignment", {})
+    for course in courses:
+        builder.add_course(course, sizes.get(course, 0), fixed_rooms.get(course), fixed_professors.get(course))
+    for course1, course2 in constraints["course_conflicts"]:
+        if course1 in builder.course_index and course2 in builder.course_index:
+            builder.add_conflict(course1, course2)
+    return builder.build()
+
+
+def from_backtracking(courses, professors, rooms, time_slots, constraints):
+    """
+    Convert the backtracking.py format ({professor: slots}, a list of room dicts
+    and "room_constraints"/"professor_constraints"/"course_sizes"/"no_overlap").
+    """
+    builder = ProblemBuilder()
+    for slot in time_slots:
+        builder.add_time_slot(slot)
+    for room in rooms:
+        builder.add_room(room["name"], room["capacity"])
+    for professor, slots in professors.items():
+        builder.add_professor(professor, [slot for slot in slots if slot in builder.slot_index])
+
+    sizes = constraints.get("course_sizes", {})
+    fixed_rooms = constraints.get("room_constraints", {})
+    fixed_professors = constraints.get("professor_constraints", {})
+    for course in courses:
+        builder.add_course(course, sizes.get(course, 0), fixed_rooms.get(course), fixed_professors.get(course))
+    for course1, course2 in constraints.get("no_overlap", []):
+        if course1 in builder.course_index and course2 in builder.course_index:
+            builder.add_conflict(course1, course2)
+    return builder.build()
+
+
+def from_greedy(courses, rooms, time_slots, prof_availability, conflicts):
+    """
+    Convert the greedy_dp.py format ((name, value) tuples and availability per course).
+    Each course gets its own professor, named after the course, who is
+    available in the course's slots.
+    """
+    builder = ProblemBuilder()
+    for slot in time_slots:
+        builder.add_time_slot(slot)
+    for room, capacity in rooms:
+        builder.add_room(room, capacity)
+    for course, students in courses:
+        slots = [slot for slot in prof_availability.get(course, []) if slot in builder.slot_index]
+        builder.add_professor(course, slots)
+        builder.add_course(course, students, professor=course)
+    for course1, course2 in conflicts:
+        if course1 in builder.course_index and course2 in builder.course_index:
+            builder.add_conflict(course1, course2)
+    return builder.build()
+
+
+def from_graph(conflicts, time_slots, rooms, professor_availability, course_details):
+    """
+    Convert the graph_*.py format (conflict adjacency and {course: {"students", "room"}}).
+    Courses are numbered in adjacency order, then any others in course_details.
+    """
+    builder = ProblemBuilder()
+    for slot in time_slots:
+        builder.add_time_slot(slot)
+    for room, capacity in rooms.items():
+        builder.add_room(room, capacity)
+    for professor, slots in professor_availability.items():
+        builder.add_professor(professor, [slot for slot in slots if slot in builder.slot_index])
+
+    for course in dict.fromkeys([*conflicts, *course_details]):
+        details = course_details[course]
+        builder.add_course(course, details["students"], details.get("room"), details.get("professor"))
+    for course, others in conflicts.items():
+        for other in others:
+            builder.add_conflict(course, other)
+    return builder.build()
+
+
+def from_dict(data):
+    """
+    Convert the JSON-friendly dict written by to_dict().
+    """
+    builder = ProblemBuilder()
+    for slot in data["time_slots"]:
+        builder.add_time_slot(slot)
+    for room, capacity in data["rooms"].items():
+        builder.add_room(room, capacity)
+    for professor, slots in data["professors"].items():
+        builder.add_professor(professor, slots)
+    for course, details in data["courses"].items():
+        builder.add_course(course, details.get("students", 0), details.get("room"), details.get("professor"))
+    for course1, course2 in data.get("conflicts", ()):
+        builder.add_conflict(course1, course2)
+    return builder.build()
+
+
+def to_genetic(problem):
+    """
+    Convert to the genetic.py format: (courses, professors, rooms, time_slots, constraints).
+    """
+    courses = list(problem.courses)
+    return (
+        courses,
+        list(problem.professors),
+        dict(zip(problem.rooms, problem.capacity.tolist())),
+        list(problem.time_slots),
+        {
+            "room_assignment": {
+                course: problem.rooms[r] for course, r in zip(courses, problem.fixed_room.tolist()) if r >= 0
+            },
+            "professor_assignment": {
+                course: problem.professors[p] for course, p in zip(courses, problem.fixed_professor.tolist()) if p >= 0
+            },
+            "professor_availability": _availability(problem),
+            "course_conflicts": [(courses[a], courses[b]) for a, b in problem.conflict_pairs.tolist()],
+            "room_capacity_constraints": dict(zip(courses, problem.students.tolist())),
+        },
+    )
+
+
+def to_backtracking(problem):
+    """
+    Convert to the backtracking.py format: (courses, professors, rooms, time_slots, constraints).
+    """
+    courses, _, rooms, time_slots, constraints = to_genetic(problem)
+    return (
+        courses,
+        constraints["professor_availability"],
+        [{"name": room, "capacity": capacity} for room, capacity in rooms.items()],
+        time_slots,
+        {
+            "room_constraints": constraints["room_assignment"],
+            "professor_constraints": constraints["professor_assignment"],
+            "course_sizes": constraints["room_capacity_constraints"],
+            "no_overlap": constraints["course_conflicts"],
+        },
+    )
+
+
+def to_greedy(problem):
+    """
+    Convert to the greedy_dp.py format: (courses, rooms, time_slots, prof_availability, conflicts).
+    greedy_dp does not choose professors, so a course may use every slot its fixed
+    professor (or, if it has none, any professor) is available in, and courses
+    sharing a fixed professor are added as conflicts.
+    """
+    courses = list(problem.courses)
+    time_slots = list(problem.time_slots)
+    any_professor = problem.available.any(axis=0)
+    prof_availability = {}
+    for course, p in zip(courses, problem.fixed_professor.tolist()):
+        usable = problem.available[p] if p >= 0 else any_professor
+        prof_availability[course] = [slot for slot, ok in zip(time_slots, usable.tolist()) if ok]
+
+    conflicts = [(courses[a], courses[b]) for a, b in problem.conflict_pairs.tolist()]
+    taught = {}
+    for i, p in enumerate(problem.fixed_professor.tolist()):
+        if p >= 0:
+            taught.setdefault(p, []).append(courses[i])
+    for same_professor in taught.values():
+        conflicts.extend(
+            (course1, course2) for k, course1 in enumerate(same_professor) for course2 in same_professor[k + 1:]
+        )
+
+    return (
+        list(zip(courses, problem.students.tolist())),
+        list(zip(problem.rooms, problem.capacity.tolist())),
+        time_slots,
+        prof_availability,
+        conflicts,
+    )
+
+
+def to_graph(problem):
+    """
+    Convert to the graph_*.py format:
+    (conflicts, time_slots, rooms, professor_availability, course_details).
+    """
+    courses = problem.courses
+    conflicts = {
+        course: [courses[j] for j in problem.neighbours(i).tolist()] for i, course in enumerate(courses)
+    }
+    course_details = {}
+    for i, course in enumerate(courses):
+        details = {"students": int(problem.students[i])}
+        if problem.fixed_room[i] >= 0:
+            details["room"] = problem.rooms[problem.fixed_room[i]]
+        if problem.fixed_professor[i] >= 0:
+            details["professor"] = problem.professors[problem.fixed_professor[i]]
+        course_details[course] = details
+    return (
+        conflicts,
+        list(problem.time_slots),
+        dict(zip(problem.rooms, problem.capacity.tolist())),
+        _availability(problem),
+        course_details,
+    )
+
+
+def to_dict(problem):
+    """
+    Convert to a JSON-friendly dict: time_slots, rooms ({room: capacity}),
+    professors ({professor: available slots}), courses ({course: {"students",
+    and optionally the fixed "room" and "professor"}}) and conflicts (course pairs).
+    """
+    conflicts, time_slots, rooms, professors, courses = to_graph(problem)
+    return {
+        "time_slots": time_slots,
+        "rooms": rooms,
+        "professors": professors,
+        "courses": courses,
+        "conflicts": [[problem.courses[a], problem.courses[b]] for a, b in problem.conflict_pairs.tolist()],
+    }
+
+
+def _availability(problem):
+    return {
+        professor: [problem.time_slots[t] for t in row.nonzero()[0].tolist()]
+        for professor, row in zip(problem.professors, problem.available)
+    }
+
+
+def example_problem():
+    """
+    The three-course example used throughout the repository.
+    """
+    builder = ProblemBuilder()
+    for slot in ["9:00-10:00", "10:00-11:00", "11:00-12:00"]:
+        builder.add_time_slot(slot)
+    builder.add_room("R1", 50)
+    builder.add_room("R2", 100)
+    builder.add_professor("P1", ["10:00-11:00", "11:00-12:00"])  # P1 is only available during these times
+    builder.add_professor("P2", ["9:00-10:00", "10:00-11:00", "11:00-12:00"])
+    builder.add_professor("P3", ["9:00-10:00", "10:00-11:00", "11:00-12:00"])
+    builder.add_course("Math101", 40, room="R1")  # Math101 must use R1
+    builder.add_course("CS102", 60)
+    builder.add_course("Bio201", 70)
+    builder.add_conflict("CS102", "Bio201")
+    return builder.build()
+
+
+if __name__ == "__main__":
+    problem = example_problem()
+    print(problem)
+    for i, course in enumerate(problem.courses):
+        neighbours = [problem.courses[j] for j in problem.neighbours(i)]
+        print(f"{course}: {problem.students[i]} students, conflicts with {neighbours}")
@@ -0,0 +1,248 @@
+import time
+
+import numpy as np
+
+import backtracking
+import genetic
+from problem import Problem
+
+
+# Changes, as accepted by apply_changes() and repair()
+def availability_change(professor, slots):
+    """
+    The professor is now available in exactly these time slots.
+    """
+    return {"kind": "availability", "professor": professor, "slots": list(slots)}
+
+
+def room_removal(room):
+    """
+    The room goes offline; courses fixed to it are no longer fixed.
+    """
+    return {"kind": "remove_room", "room": room}
+
+
+def new_course(course, students=0, room=None, professor=None):
+    return {"kind": "add_course", "course": course, "students": students, "room": room, "professor": professor}
+
+
+def new_conflict(course1, course2):
+    return {"kind": "add_conflict", "courses": (course1, course2)}
+
+
+def _lookup(index, kind, name):
+    try:
+        return index[name]
+    except KeyError:
+        raise ValueError(f"Unknown {kind}: {name!r}") from None
+
+
+def apply_changes(problem, changes):
+    """
+    Return a new Problem with the changes applied; the original is left as it is.
+    """
+    courses, rooms = list(problem.courses), list(problem.rooms)
+    course_index, room_index = dict(problem.course_index), dict(problem.room_index)
+    students, capacity = problem.students, problem.capacity
+    fixed_room, fixed_professor = problem.fixed_room, problem.fixed_professor
+    available = problem.available.copy()
+    conflicts = [problem.conflict_pairs]
+
+    for change in changes:
+        kind = change["kind"]
+        if kind == "availability":
+            p = _lookup(problem.professor_index, "professor", change["professor"])
+            available[p] = False
+            for slot in change["slots"]:
+                available[p, _lookup(problem.slot_index, "time slot", slot)] = True
+        elif kind == "remove_room":
+            r = _lookup(room_index, "room", change["room"])
+            del rooms[r]
+            room_index = {room: j for j, room in enumerate(rooms)}
+            capacity = np.delete(capacity, r)
+            fixed_room = np.where(fixed_room == r, -1, fixed_room - (fixed_room > r))
+        elif kind == "add_course":
+            if change["course"] in course_index:
+                raise ValueError(f"Duplicate course: {change['course']!r}")
+            room, professor = change.get("room"), change.get("professor")
+            course_index[change["course"]] = len(courses)
+            courses.append(change["course"])
+            students = np.append(students, int(change.get("students", 0)))
+            fixed_room = np.append(fixed_room, -1 if room is None else _lookup(room_index, "room", room))
+            fixed_professor = np.append(
+                fixed_professor, -1 if professor is None else _lookup(problem.professor_index, "professor", professor)
+            )
+        elif kind == "add_conflict":
+            course1, course2 = change["courses"]
+            conflicts.append([[_lookup(course_index, "course", course1), _lookup(course_index, "course", course2)]])
+        else:
+            raise ValueError(f"Unknown change: {kind}")
+
+    return Problem(
+        courses, rooms, problem.time_slots, problem.professors, students, capacity,
+        fixed_room, fixed_professor, available, np.concatenate(conflicts),
+    )
+
+
+def neighbourhood(problem, schedule, seeds, radius):
+    """
+    The seed courses plus `radius` rings around them. Each ring adds the
+    conflict neighbours of every course so far and the courses scheduled with
+    the same professor or in the same room, which are the ones that can make
+    room for a move.
+    """
+    by_professor = {}
+    by_room = {}
+    for course, details in schedule.items():
+        by_professor.setdefault(details.get("professor"), []).append(course)
+        by_room.setdefault(details.get("room"), []).append(course)
+
+    area = set(seeds)
+    ring = set(seeds)
+    for _ in range(radius):
+        grown = set()
+        for course in ring:
+            grown.update(problem.courses[j] for j in problem.neighbours(problem.course_index[course]).tolist())
+            details = schedule.get(course)
+            if details is not None:
+                grown.update(by_professor.get(details.get("professor"), ()))
+                grown.update(by_room.get(details.get("room"), ()))
+        ring = grown - area
+        area |= ring
+    return area
+
+
+def _resolve_backtracking(problem, schedule, free, engine, time_limit):
+    timetabling = backtracking.Timetabling.from_problem(problem)
+    timetabling.courses = [course for course in problem.courses if course in free or course in schedule]
+    for course, details in schedule.items():
+        if course not in free:
+            timetabling.assign(course, details["professor"], details["room"], details["time_slot"])
+    if time_limit is not None:
+        deadline = time.perf_counter() + time_limit
+        timetabling.should_stop = lambda: time.perf_counter() >= deadline
+    solution, _ = timetabling.solve(engine)
+    return dict(solution) if isinstance(solution, dict) else None
+
+
+# Module settings of genetic.py that _resolve_genetic() changes for the duration
+_genetic_state = ("courses", "professors", "rooms", "time_slots", "constraints", "population_size")
+
+
+def _resolve_genetic(problem, schedule, free, time_limit, done, population_size=20, generations=50, patience=10):
+    """
+    Evolve only the free courses: the pinned assignments are in every
+    chromosome, but crossover and mutation never touch them. Stops early once
+    done(chromosome) accepts the best one.
+    """
+    start = time.perf_counter()
+    saved = {name: getattr(genetic, name) for name in _genetic_state}
+    genetic.load_problem(problem)
+    pinned = {course: details for course, details in schedule.items() if course not in free}
+    genetic.courses = [course for course in problem.courses if course in free]
+    genetic.population_size = population_size
+    try:
+        population = [
+            genetic.evaluate({**pinned, **{course: genetic.random_assignment(course) for course in genetic.courses}})
+            for _ in range(population_size)
+        ]
+        best = max(population, key=lambda individual: individual.fitness)
+        stale_generations = 0
+        for _ in range(generations):
+            if stale_generations == 0 and done(best.chromosome):
+                break
+            if stale_generations >= patience:
+                break
+            if time_limit is not None and time.perf_counter() - start >= time_limit:
+                break
+            population = genetic.next_generation(population, elite_size=1)
+            leader = max(population, key=lambda individual: individual.fitness)
+            if leader.fitness > best.fitness:
+                best, stale_generations = leader, 0
+            else:
+                stale_generations += 1
+    finally:
+        # Put back whatever problem the genetic module had loaded before
+        for name, value in saved.items():
+            setattr(genetic, name, value)
+        genetic.build_indexes()
+    return dict(best.chromosome)
+
+
+def resolve(problem, schedule, invalid, before=(), engine="mrv", max_radius=2, time_limit=1.0, full_fallback=True):
+    """
+    Re-solve the `invalid` courses of `schedule` until no violation outside
+    `before` is left, moving as few other courses as possible: only the invalid
+    courses are freed at first, with every other assignment pinned; if that
+    fails, the neighbourhood grows one ring at a time up to max_radius, and then
+    (if full_fallback) every scheduled course is re-solved. engine is a
+    Timetabling.solve engine ("basic", "mrv", "bitset") or "genetic";
+    time_limit caps each attempt in seconds. If no attempt gets rid of every
+    such violation, the best schedule found is returned, which may leave
+    invalid courses unscheduled.
+    """
+    def new_violations(candidate):
+        return sum(1 for violation in problem.violations(candidate) if violation not in before)
+
+    best = {course: details for course, details in schedule.items() if course not in invalid}
+    best_violations = new_violations(best)
+    if invalid:
+        # Courses the schedule had left out stay out
+        candidates = invalid | set(schedule)
+        areas = [neighbourhood(problem, schedule, invalid, radius) & candidates for radius in range(max_radius + 1)]
+        if full_fallback:
+            areas.append(candidates)
+        tried = set()
+        for free in areas:
+            if len(free) in tried:
+                continue  # Same area as the previous ring
+            tried.add(len(free))
+            if engine == "genetic":
+                result = _resolve_genetic(problem, schedule, free, time_limit, lambda chromosome: not new_violations(chromosome))
+            else:
+                result = _resolve_backtracking(problem, schedule, free, engine, time_limit)
+            if result is None:
+                continue
+            violations = new_violations(result)
+            if violations < best_violations:
+                best, best_violations = result, violations
+            if not violations:
+                break
+    return best
+
+
+def repair(problem, schedule, changes=(), engine="mrv", max_radius=2, time_limit=1.0, full_fallback=True):
+    """
+    Apply `changes` and repair `schedule` for them, moving as few courses as
+    possible (see resolve() for how and for the options). Only the courses
+    with a violation the changes introduced are re-solved; violations the
+    schedule already had are left alone.
+    Returns (changed problem, new schedule, courses whose assignment changed).
+    """
+    before = set(problem.violations(schedule))
+    problem = apply_changes(problem, changes)
+    schedule = {course: details for course, details in schedule.items() if course in problem.course_index}
+    invalid = {
+        course for violation in problem.violations(schedule)
+        if violation not in before and (course := violation[1]) in problem.course_index
+    }
+    best = resolve(problem, schedule, invalid, before, engine, max_radius, time_limit, full_fallback)
+    moved = [course for course in problem.courses if best.get(course) != schedule.get(course)]
+    return problem, best, moved
+
+
+if __name__ == "__main__":
+    from problem import example_problem
+
+    problem = example_problem()
+    schedule = backtracking.solve_problem(problem, "mrv")
+    print("Schedule:")
+    for course, details in schedule.items():
+        print(f"{details['time_slot']}: {course} in {details['room']} with {details['professor']}")
+
+    changes = [availability_change("P2", ["11:00-12:00"]), new_course("Chem301", 30), new_conflict("Chem301", "CS102")]
+    problem, schedule, moved = repair(problem, schedule, changes)
+    print(f"\nRepaired schedule (moved: {', '.join(moved)}):")
+    for course, details in schedule.items():
+        print(f"{details['time_slot']}: {course} in {details['room']} with {details['professor']}")
+    print(f"Violations: {problem.violations(schedule)}")
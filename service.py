@@ -0,0 +1,315 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from problem import from_dict, to_dict
+
+# Solvers a job may ask for; the worker imports their modules once at startup
+solver_names = ["genetic", "backtracking", "bfs", "dfs", "dsatur", "greedy_dp"]
+
+default_port = 8765
+progress_interval = 0.5  # Seconds between two progress events of one job
+cancel_grace = 5.0  # Seconds past a job's time limit before it is cancelled outright
+reserved_options = ("time_limit", "on_generation")  # Set by the service itself
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job is cancelled."""
+
+
+# Worker processes
+def _init_worker():
+    # Pay the imports once per worker, not once per job
+    global backtracking, genetic, graph_bfs, graph_dfs, graph_dsatur, greedy_dp
+    sys.stdout = open(os.devnull, "w")  # Solvers print their progress
+    import backtracking
+    import genetic
+    import graph_bfs
+    import graph_dfs
+    import graph_dsatur
+    import greedy_dp
+
+
+def _run_job(job_id, solver, instance, options, time_limit, cancel, progress):
+    """
+    Solve one job in a worker process. Polls `cancel` (a manager Event) and
+    puts progress events on `progress` (a manager Queue) at most every
+    progress_interval seconds. Returns (schedule, violations).
+    """
+    problem = from_dict(instance)
+    start = time.perf_counter()
+    last_report = start
+
+    def report(**values):
+        nonlocal last_report
+        now = time.perf_counter()
+        if now - last_report >= progress_interval:
+            last_report = now
+            progress.put({"event": "progress", "job": job_id, "elapsed": round(now - start, 3), **values})
+
+    def should_stop():
+        if cancel.is_set():
+            raise JobCancelled()
+        return time_limit is not None and time.perf_counter() - start >= time_limit
+
+    if solver == "genetic":
+        def on_generation(stats):
+            should_stop()
+            report(**stats)
+
+        genetic.load_problem(problem)
+        schedule, _ = genetic.genetic_algorithm(time_limit=time_limit, on_generation=on_generation, **options)
+    elif solver == "backtracking":
+        timetabling = backtracking.Timetabling.from_problem(problem)
+
+        def poll():
+            report(nodes=timetabling.nodes)
+            return should_stop()
+
+        timetabling.should_stop = poll
+        schedule, _ = timetabling.solve(options.get("engine", "mrv"))
+        schedule = schedule if isinstance(schedule, dict) else {}
+    else:
+        # One polynomial pass each; they are not interrupted once started
+        solve = {
+            "bfs": graph_bfs.solve_problem,
+            "dfs": graph_dfs.solve_problem,
+            "dsatur": graph_dsatur.solve_problem,
+            "greedy_dp": greedy_dp.solve_problem,
+        }[solver]
+        schedule = solve(problem, **options)
+    return schedule or {}, len(problem.violations(schedule or {}))
+
+
+class Job:
+    def __init__(self, job_id, solver, instance, options, time_limit, cancel, listener):
+        self.id = job_id
+        self.solver = solver
+        self.instance = instance
+        self.options = options
+        self.time_limit = time_limit
+        self.cancel = cancel
+        self.listener = listener  # asyncio.Queue of events for the submitter
+        self.state = "queued"
+
+
+class SolveService:
+    """
+    Runs solve jobs in a bounded pool of long-lived worker processes.
+    At most `workers` jobs run at once and at most `max_queued` wait; further
+    submissions are refused, which bounds the memory held for instances.
+    Events for a job are put on the listener queue given to submit().
+    """
+
+    def __init__(self, workers=None, max_queued=100):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queued = max_queued
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self.closed = False
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.manager = multiprocessing.Manager()
+        self.progress = self.manager.Queue()
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        self.pending = asyncio.Queue(maxsize=self.max_queued)
+        self.tasks = [asyncio.create_task(self._runner()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self._forward_progress()))
+
+    async def close(self):
+        self.closed = True
+        for job in self.jobs.values():
+            job.cancel.set()
+        for task in self.tasks:
+            task.cancel()
+        self.progress.put(None)  # Wakes the progress forwarder's thread
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.manager.shutdown()
+
+    def submit(self, solver, instance, listener, options=None, time_limit=None):
+        """
+        Queue a job; returns its ID. Raises ValueError for an unknown solver or
+        options that set one of reserved_options (the time limit is a job
+        field), and asyncio.QueueFull when max_queued jobs are already waiting.
+        """
+        if solver not in solver_names:
+            raise ValueError(f"Unknown solver: {solver}")
+        reserved = sorted(set(options or {}) & set(reserved_options))
+        if reserved:
+            raise ValueError(f"Options may not set {', '.join(reserved)}")
+        job = Job(next(self._ids), solver, instance, dict(options or {}), time_limit, self.manager.Event(), listener)
+        self.pending.put_nowait(job)
+        self.jobs[job.id] = job
+        listener.put_nowait({"event": "queued", "job": job.id, "position": self.pending.qsize()})
+        return job.id
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job. Returns False if it is unknown or already over.
+        """
+        job = self.jobs.get(job_id)
+        if self.closed or job is None or job.state not in ("queued", "running"):
+            return False  # close() has already cancelled every job
+        job.cancel.set()
+        if job.state == "queued":
+            self._finish(job, {"event": "cancelled", "job": job.id})
+        return True
+
+    def status(self):
+        states = [job.state for job in self.jobs.values()]
+        return {
+            "event": "status", "workers": self.workers,
+            "queued": states.count("queued"), "running": states.count("running"),
+        }
+
+    def _finish(self, job, event):
+        job.state = event["event"]
+        job.instance = None
+        del self.jobs[job.id]
+        job.listener.put_nowait(event)
+
+    async def _runner(self):
+        while True:
+            job = await self.pending.get()
+            if job.state != "queued":
+                continue  # Cancelled while waiting
+            job.state = "running"
+            job.listener.put_nowait({"event": "started", "job": job.id})
+            backstop = None
+            if job.time_limit is not None:
+                backstop = self.loop.call_later(job.time_limit + cancel_grace, job.cancel.set)
+            start = time.perf_counter()
+            try:
+                schedule, violations = await self.loop.run_in_executor(
+                    self.pool, _run_job, job.id, job.solver, job.instance, job.options, job.time_limit,
+                    job.cancel, self.progress,
+                )
+            except JobCancelled:
+                self._finish(job, {"event": "cancelled", "job": job.id})
+            except Exception as error:  # A failing job is reported, not fatal
+                self._finish(job, {"event": "failed", "job": job.id, "error": f"{type(error).__name__}: {error}"})
+            else:
+                self._finish(job, {
+                    "event": "done", "job": job.id, "time": round(time.perf_counter() - start, 3),
+                    "violations": violations, "schedule": schedule,
+                })
+            finally:
+                if backstop is not None:
+                    backstop.cancel()
+
+    async def _forward_progress(self):
+        # The manager queue blocks, so it is read from a thread
+        while True:
+            event = await self.loop.run_in_executor(None, self.progress.get)
+            if event is None:
+                return
+            job = self.jobs.get(event["job"])
+            if job is not None and job.state == "running":
+                job.listener.put_nowait(event)
+
+
+async def handle_connection(service, reader, writer):
+    """
+    One client connection, speaking JSON lines. Requests:
+    - {"op": "submit", "solver", "instance" (see problem.to_dict), "options", "time_limit"}
+    - {"op": "cancel", "job"}
+    - {"op": "status"}
+    Replies and job events (queued, started, progress, done, failed,
+    cancelled) come back as JSON lines on the same connection.
+    """
+    events = asyncio.Queue()
+    submitted = set()
+
+    async def send_events():
+        while True:
+            event = await events.get()
+            writer.write(json.dumps(event).encode() + b"\n")
+            await writer.drain()
+
+    sender = asyncio.create_task(send_events())
+    try:
+        while line := await reader.readline():
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                op = request.get("op")
+                if op == "submit":
+                    submitted.add(service.submit(
+                        request["solver"], request["instance"], events, request.get("options"), request.get("time_limit")
+                    ))
+                elif op == "cancel":
+                    if not service.cancel(request["job"]):
+                        events.put_nowait({"event": "error", "job": request["job"], "error": "No such active job"})
+                elif op == "status":
+                    events.put_nowait(service.status())
+                else:
+                    events.put_nowait({"event": "error", "error": f"Unknown op: {op}"})
+            except asyncio.QueueFull:
+                events.put_nowait({"event": "error", "error": "Queue full, try again later"})
+            except (ValueError, KeyError, TypeError) as error:
+                events.put_nowait({"event": "error", "error": f"{type(error).__name__}: {error}"})
+    finally:
+        # The client is gone (or the connection broke), so nobody wants its jobs any more
+        for job_id in submitted:
+            service.cancel(job_id)
+        sender.cancel()
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=default_port, workers=None, max_queued=100):
+    service = SolveService(workers, max_queued)
+    await service.start()
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer), host, port, limit=1 << 26
+    )
+    print(f"Serving on {host}:{port} with {service.workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+async def solve_remote(problem, solver, host="127.0.0.1", port=default_port, options=None, time_limit=None):
+    """
+    Submit one Problem to a running service and yield its events until the job is over.
+    """
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 26)
+    try:
+        request = {"op": "submit", "solver": solver, "instance": to_dict(problem), "options": options or {},
+                   "time_limit": time_limit}
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        while line := await reader.readline():
+            event = json.loads(line)
+            yield event
+            if event["event"] in ("done", "failed", "cancelled", "error"):
+                return
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve timetable solves over JSON lines.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=default_port)
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-queued", type=int, default=100, help="jobs that may wait before submissions are refused")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_queued))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
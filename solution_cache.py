@@ -0,0 +1,268 @@
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+import backtracking
+import genetic
+
+# One-permutation MinHash: token hashes are re-mixed and split into 2**signature_bits
+# bins by their top bits; the signature is the smallest hash in each bin (or
+# _empty). The share of equal bins estimates the Jaccard similarity of two
+# instances to within about 1/sqrt(bins).
+signature_bits = 7
+_seed = np.uint64(0x5DEECE66D2B7E151)
+_empty = np.iinfo(np.uint64).max
+
+
+def _mix(z):
+    # splitmix64 finalizer, elementwise on uint64 arrays
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _hash(kind, *columns):
+    # One 64-bit hash per row of the columns, distinct per kind
+    h = np.full(len(columns[0]), kind, dtype=np.uint64)
+    for column in columns:
+        h = _mix(h ^ np.asarray(column).astype(np.uint64))
+    return h
+
+
+def _name_hashes(names):
+    return np.frombuffer(
+        b"".join(hashlib.blake2b(name.encode(), digest_size=8).digest() for name in names), dtype=np.uint64
+    )
+
+
+def _tokens(problem):
+    """
+    The instance as a set of 64-bit token hashes, one per time slot, room with
+    its capacity, professor, available (professor, slot), course with its size
+    and fixed room and professor, and conflict. Names are hashed rather than
+    IDs, so the set does not depend on the order anything was added in.
+    """
+    courses, rooms = _name_hashes(problem.courses), _name_hashes(problem.rooms)
+    slots, professors = _name_hashes(problem.time_slots), _name_hashes(problem.professors)
+    no_room = np.append(rooms, np.uint64(0))  # Index -1 (not fixed) hashes as 0
+    no_professor = np.append(professors, np.uint64(0))
+    p, t = np.nonzero(problem.available)
+    a, b = problem.conflict_pairs.T
+    return np.concatenate([
+        _hash(1, slots),
+        _hash(2, rooms, problem.capacity),
+        _hash(3, professors),
+        _hash(4, professors[p], slots[t]),
+        _hash(5, courses, problem.students, no_room[problem.fixed_room], no_professor[problem.fixed_professor]),
+        _hash(6, np.minimum(courses[a], courses[b]), np.maximum(courses[a], courses[b])),
+    ])
+
+
+def fingerprint(problem):
+    """
+    Returns (key, signature): the SHA-256 of the canonical instance, and a
+    MinHash signature whose matching share estimates the Jaccard similarity
+    of two instances' constraint sets.
+    """
+    tokens = np.sort(_tokens(problem))
+    key = hashlib.sha256(tokens.tobytes()).hexdigest()
+    mixed = np.sort(_mix(tokens ^ _seed))
+    starts = np.searchsorted(mixed, np.arange(1 << signature_bits, dtype=np.uint64) << np.uint64(64 - signature_bits))
+    ends = np.append(starts[1:], len(mixed))
+    signature = np.where(starts < ends, mixed[np.minimum(starts, max(len(mixed) - 1, 0))], _empty)
+    return key, signature.astype(np.uint64)
+
+
+def similarity(signatures, signature):
+    """
+    Estimated Jaccard similarity of one signature to each row of `signatures`;
+    bins empty in both are left out.
+    """
+    filled = (signatures != _empty) | (signature != _empty)
+    return ((signatures == signature) & filled).sum(axis=-1) / np.maximum(filled.sum(axis=-1), 1)
+
+
+class SolutionCache:
+    """
+    Schedules keyed by the canonical hash of their instance, held in an LRU
+    of `capacity` entries and, if `path` is given, in an SQLite file that
+    outlives the process (evicting the least recently used beyond disk_capacity).
+    """
+
+    def __init__(self, path=None, capacity=128, disk_capacity=10_000):
+        self.capacity = capacity
+        self.disk_capacity = disk_capacity
+        self.memory = OrderedDict()  # key -> (signature, schedule, violations)
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                "key TEXT PRIMARY KEY, signature BLOB, schedule BLOB, violations INTEGER, used REAL)"
+            )
+            self.db.commit()
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def _remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.capacity:
+            self.memory.popitem(last=False)
+
+    def _load(self, key):
+        entry = self.memory.get(key)
+        if entry is not None:
+            self.memory.move_to_end(key)
+            return entry
+        if self.db is None:
+            return None
+        row = self.db.execute("SELECT signature, schedule, violations FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.db.execute("UPDATE solutions SET used = ? WHERE key = ?", (time.time(), key))
+        self.db.commit()
+        entry = (np.frombuffer(row[0], dtype=np.uint64), json.loads(zlib.decompress(row[1])), row[2])
+        self._remember(key, entry)
+        return entry
+
+    def _forget(self, key):
+        self.memory.pop(key, None)
+        if self.db is not None:
+            self.db.execute("DELETE FROM solutions WHERE key = ?", (key,))
+            self.db.commit()
+
+    def put(self, problem, schedule, fingerprints=None):
+        """
+        Store a schedule for this instance, replacing any earlier one; returns
+        False without storing it if it leaves any course unscheduled.
+        fingerprints is fingerprint(problem) if the caller already has it.
+        """
+        found = problem.violations(schedule)
+        if any(kind == "unscheduled" for kind, _ in found):
+            return False
+        key, signature = fingerprints or fingerprint(problem)
+        violations = len(found)
+        self._remember(key, (signature, schedule, violations))
+        if self.db is not None:
+            self.db.execute(
+                "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?)",
+                (key, signature.tobytes(), zlib.compress(json.dumps(schedule).encode()), violations, time.time()),
+            )
+            self.db.execute(
+                "DELETE FROM solutions WHERE key IN "
+                "(SELECT key FROM solutions ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.disk_capacity,),
+            )
+            self.db.commit()
+        return True
+
+    def get(self, problem, fingerprints=None):
+        """
+        The stored schedule for exactly this instance, or None. A stored schedule
+        is revalidated first and dropped if its violations no longer match or
+        it leaves a course unscheduled.
+        """
+        key, _ = fingerprints or fingerprint(problem)
+        entry = self._load(key)
+        if entry is None:
+            return None
+        _, schedule, violations = entry
+        found = problem.violations(schedule)
+        if len(found) != violations or any(kind == "unscheduled" for kind, _ in found):
+            self._forget(key)
+            return None
+        return schedule
+
+    def nearest(self, problem, threshold=0.8, fingerprints=None):
+        """
+        The schedule of the most similar stored instance as (similarity, schedule),
+        or None if none is at least `threshold` similar (estimated Jaccard
+        similarity of the two instances' constraint sets).
+        """
+        key, signature = fingerprints or fingerprint(problem)
+        candidates = {cached_key: entry[0] for cached_key, entry in self.memory.items()}
+        if self.db is not None:
+            for cached_key, blob in self.db.execute("SELECT key, signature FROM solutions"):
+                candidates.setdefault(cached_key, np.frombuffer(blob, dtype=np.uint64))
+        candidates.pop(key, None)
+        if not candidates:
+            return None
+        keys = list(candidates)
+        scores = similarity(np.stack([candidates[cached_key] for cached_key in keys]), signature)
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        entry = self._load(keys[best])
+        return (float(scores[best]), entry[1]) if entry is not None else None
+
+
+def cached_solve(cache, problem, solver="mrv", threshold=0.8, time_limit=None, **options):
+    """
+    Solve through the cache. Returns (schedule, source):
+    - "hit": the stored schedule of this exact instance, revalidated;
+    - "warm": solved starting from the schedule of a similar instance, which
+      seeds the genetic population (solver="genetic"), or for backtracking
+      (solver="basic" or "mrv") is assigned wherever still valid before the
+      rest is searched, and failing that orders the values tried;
+    - "cold": solved from scratch.
+    The result is stored for next time unless time_limit cut the solve short
+    or it leaves courses unscheduled. options go to genetic_algorithm.
+    """
+    fingerprints = fingerprint(problem)
+    schedule = cache.get(problem, fingerprints)
+    if schedule is not None:
+        return schedule, "hit"
+
+    near = cache.nearest(problem, threshold, fingerprints)
+    source = "cold" if near is None else "warm"
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    if solver == "genetic":
+        genetic.load_problem(problem)
+        options.setdefault("elite_size", 1)  # Keeps the seed until something beats it
+        seeds = [] if near is None else [near[1]]
+        schedule, _ = genetic.genetic_algorithm(time_limit=time_limit, seeds=seeds, **options)
+        complete = deadline is None or time.perf_counter() < deadline
+    else:
+        def attempt(place_hints):
+            timetabling = backtracking.Timetabling.from_problem(problem)
+            if deadline is not None:
+                timetabling.should_stop = lambda: time.perf_counter() >= deadline
+            if near is not None:
+                timetabling.warm_start(near[1])
+                if place_hints:
+                    timetabling.assign_hints()
+            found, _ = timetabling.solve(solver)
+            return dict(found) if isinstance(found, dict) else None
+
+        schedule = attempt(True) if near is not None else None
+        if schedule is None and (deadline is None or time.perf_counter() < deadline):
+            schedule = attempt(False)  # From scratch, with the hints only ordering values
+        complete = schedule is not None
+        schedule = schedule or {}
+
+    if complete:
+        cache.put(problem, schedule, fingerprints)
+    return schedule, source
+
+
+if __name__ == "__main__":
+    from instances import generate_instance
+    from repair import apply_changes, new_conflict
+
+    cache = SolutionCache()
+    problem = generate_instance(200, seed=4, room_scarcity=0.5)
+    edited = apply_changes(problem, [new_conflict("C0", "C1")])
+    for label, instance in [("original", problem), ("resubmitted", problem), ("edited", edited)]:
+        start = time.perf_counter()
+        schedule, source = cached_solve(cache, instance, "mrv", time_limit=30)
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {source} in {elapsed * 1000:.0f}ms, {len(instance.violations(schedule))} violations")